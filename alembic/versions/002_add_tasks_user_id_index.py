@@ -0,0 +1,24 @@
+"""Add index on tasks.user_id
+
+Revision ID: 002_add_tasks_user_id_index
+Revises: 001_add_conversation_message_models
+Create Date: 2026-10-15 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '002_add_tasks_user_id_index'
+down_revision: Union[str, None] = '001_add_conversation_message_models'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f('ix_tasks_user_id'), 'tasks', ['user_id'], unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_tasks_user_id'), table_name='tasks', if_exists=True)
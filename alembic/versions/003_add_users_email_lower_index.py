@@ -0,0 +1,25 @@
+"""Add functional index on lower(users.email)
+
+Revision ID: 003_add_users_email_lower_index
+Revises: 002_add_tasks_user_id_index
+Create Date: 2026-10-15 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '003_add_users_email_lower_index'
+down_revision: Union[str, None] = '002_add_tasks_user_id_index'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_users_email_lower', 'users', [sa.text('lower(email)')], unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_email_lower', table_name='users', if_exists=True)
@@ -0,0 +1,24 @@
+"""Add composite index on tasks (user_id, is_completed)
+
+Revision ID: 004_add_tasks_user_status_index
+Revises: 003_add_users_email_lower_index
+Create Date: 2026-10-15 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '004_add_tasks_user_status_index'
+down_revision: Union[str, None] = '003_add_users_email_lower_index'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_tasks_user_id_is_completed', 'tasks', ['user_id', 'is_completed'], unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tasks_user_id_is_completed', table_name='tasks', if_exists=True)
@@ -0,0 +1,27 @@
+"""Add unique covering index on token_blacklist.token
+
+Revision ID: 005_add_token_blacklist_token_index
+Revises: 004_add_tasks_user_status_index
+Create Date: 2026-10-15 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '005_add_token_blacklist_token_index'
+down_revision: Union[str, None] = '004_add_tasks_user_status_index'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_token_blacklist_token', 'token_blacklist', ['token'], unique=True,
+        postgresql_include=['expires_at'], if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_token_blacklist_token', table_name='token_blacklist', if_exists=True)
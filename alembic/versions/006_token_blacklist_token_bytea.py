@@ -0,0 +1,34 @@
+"""Store token_blacklist.token as raw digest bytes
+
+Revision ID: 006_token_blacklist_token_bytea
+Revises: 005_add_token_blacklist_token_index
+Create Date: 2026-10-15 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '006_token_blacklist_token_bytea'
+down_revision: Union[str, None] = '005_add_token_blacklist_token_index'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing hex fingerprints (SHA-256 or BLAKE2b) decode to the same digests the app now binds
+    op.alter_column(
+        'token_blacklist', 'token',
+        type_=sa.LargeBinary(), existing_nullable=False,
+        postgresql_using="decode(token, 'hex')"
+    )
+
+
+def downgrade() -> None:
+    op.alter_column(
+        'token_blacklist', 'token',
+        type_=sa.String(), existing_nullable=False,
+        postgresql_using="encode(token, 'hex')"
+    )
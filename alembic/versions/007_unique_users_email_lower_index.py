@@ -0,0 +1,44 @@
+"""Make the lower(users.email) index unique
+
+Revision ID: 007_unique_users_email_lower_index
+Revises: 006_token_blacklist_token_bytea
+Create Date: 2026-10-16 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '007_unique_users_email_lower_index'
+down_revision: Union[str, None] = '006_token_blacklist_token_bytea'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Case-variant duplicates need a reviewed data fix (which account keeps the address);
+    # refuse to guess and report them instead
+    duplicates = op.get_bind().execute(sa.text("""
+        SELECT lower(email) AS email, count(*) AS accounts
+        FROM users
+        GROUP BY lower(email)
+        HAVING count(*) > 1
+        ORDER BY lower(email)
+    """)).all()
+    if duplicates:
+        listed = ", ".join(f"{email} ({accounts} accounts)" for email, accounts in duplicates[:20])
+        raise RuntimeError(
+            f"Cannot create unique index ix_users_email_lower: {len(duplicates)} email "
+            f"address(es) are registered more than once ignoring case: {listed}. "
+            "Merge or rename these accounts, then rerun the migration."
+        )
+
+    op.drop_index('ix_users_email_lower', table_name='users', if_exists=True)
+    op.create_index('ix_users_email_lower', 'users', [sa.text('lower(email)')], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_email_lower', table_name='users', if_exists=True)
+    op.create_index('ix_users_email_lower', 'users', [sa.text('lower(email)')], unique=False)
@@ -7,15 +7,17 @@ and follows security best practices for authentication.
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials
 from sqlmodel.ext.asyncio.session import AsyncSession
-from sqlmodel import select
-from datetime import timedelta
+from sqlmodel import select, func
 import logging
 import re
 
 from ..database import get_async_session
 from ..models import User, UserLogin
 from ..config import settings
-from ..utils.auth import verify_password, create_access_token, blacklist_token, security
+from ..utils.auth import (
+    verify_password_async, hash_password_async, password_needs_rehash, create_access_token_for_user,
+    cache_user, blacklist_token, security
+)
 
 
 router = APIRouter()
@@ -46,12 +48,12 @@ async def login_user(
     """
     try:
         # Find user by email
-        statement = select(User).where(User.email == user_credentials.email)
+        statement = select(User).where(func.lower(User.email) == user_credentials.email.strip().lower())
         result = await session.exec(statement)
         user = result.first()
 
         # Validate credentials
-        if not user or not verify_password(user_credentials.password, user.hashed_password):
+        if not user or not await verify_password_async(user_credentials.password, user.hashed_password):
             logger.warning(f"Failed login attempt for email: {user_credentials.email}")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -68,10 +70,18 @@ async def login_user(
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
+        # Upgrade legacy password hashes (e.g. bcrypt to argon2id) while the plain password is at hand
+        if password_needs_rehash(user.hashed_password):
+            user.hashed_password = await hash_password_async(user_credentials.password)
+            session.add(user)
+            await session.commit()
+
+        # The client's next requests will authenticate as this user; skip their lookup
+        cache_user(user)
+
         # Create access token with user information
-        access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-        access_token = create_access_token(
-            data={"user_id": str(user.user_id)}, expires_delta=access_token_expires
+        access_token = create_access_token_for_user(
+            str(user.user_id), settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
         )
 
         logger.info(f"User successfully logged in: {user.email}")
@@ -5,6 +5,7 @@ from sqlmodel import select
 from typing import List
 import uuid
 
+from ..cache.tasks_cache import invalidate_tasks
 from ..database import get_async_session
 from ..models import Task, TaskCreate, TaskRead, TaskUpdate, User
 from ..utils.auth import get_current_user
@@ -59,6 +60,7 @@ async def create_task(
         # Add the task to the session and commit it to the database
         session.add(task)
         await session.commit()
+        await invalidate_tasks(user_id)
         await session.refresh(task)  # Refresh to get the auto-generated fields like task_id
 
         # Return the created task
@@ -252,19 +254,23 @@ async def update_task(
         for field, value in update_data.items():
             setattr(task, field, value)
 
+        now = datetime.utcnow()
+
         # If is_completed is being set to True and completed_at is not set, set it to now
         if hasattr(task_data, 'is_completed') and task_data.is_completed and task.completed_at is None:
-            task.completed_at = datetime.utcnow()
+            task.completed_at = now
         # If is_completed is being set to False, clear completed_at
         elif hasattr(task_data, 'is_completed') and not task_data.is_completed:
             task.completed_at = None
 
         # Update the updated_at timestamp
-        task.updated_at = datetime.utcnow()
+        task.updated_at = now
 
         # Commit changes to the database
+        # Every changed column was set above and sessions keep attributes after commit
+        # (expire_on_commit=False), so no refresh SELECT is needed
         await session.commit()
-        await session.refresh(task)  # Refresh to get the updated task with new timestamps
+        await invalidate_tasks(user_id)
 
         # Return the updated task
         return task
@@ -332,6 +338,7 @@ async def delete_task(
         # Delete the task from the database
         await session.delete(task)
         await session.commit()
+        await invalidate_tasks(user_id)
 
         # Return success message
         return {"message": "Task deleted successfully"}
@@ -399,22 +406,24 @@ async def update_task_completion(
         # Toggle the completion status
         new_completion_status = not task.is_completed
         task.is_completed = new_completion_status
+        now = datetime.utcnow()
 
         # Set completed_at timestamp based on the new status
         if new_completion_status:
             # Task is being marked as completed
-            from datetime import datetime
-            task.completed_at = datetime.utcnow()
+            task.completed_at = now
         else:
             # Task is being marked as incomplete
             task.completed_at = None
 
         # Update the updated_at timestamp
-        task.updated_at = datetime.utcnow()
+        task.updated_at = now
 
         # Commit changes to the database
+        # Every changed column was set above and sessions keep attributes after commit
+        # (expire_on_commit=False), so no refresh SELECT is needed
         await session.commit()
-        await session.refresh(task)  # Refresh to get the updated task with new timestamps
+        await invalidate_tasks(user_id)
 
         # Return the updated task
         return task
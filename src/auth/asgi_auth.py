@@ -0,0 +1,24 @@
+"""
+Pure ASGI authentication middleware.
+
+Verifies the bearer token once per HTTP request and stores the result in
+scope["state"], where get_current_user_id picks it up without re-decoding.
+The middleware never rejects a request itself: public routes (login,
+registration, health) pass through, and protected routes raise 401 from
+their dependency.
+"""
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from ..utils.auth import authenticate_scope
+
+
+class AuthMiddleware:
+    """Decode the Authorization header into request state for downstream routes."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            authenticate_scope(scope)
+        await self.app(scope, receive, send)
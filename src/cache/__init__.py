@@ -0,0 +1 @@
+"""Caching helpers for the Todo application."""
@@ -0,0 +1,107 @@
+"""
+Read-through cache for a user's serialized task list.
+
+Backed by Redis when the optional ``redis`` package is installed and REDIS_URL is
+configured. Otherwise every lookup misses and writes are no-ops, so callers can use
+it unconditionally. Cache failures are logged and never fail the request.
+"""
+import logging
+from typing import Optional, Tuple, Union
+import uuid
+
+try:
+    from redis import asyncio as redis_asyncio
+    HAS_REDIS = True
+except ImportError:
+    HAS_REDIS = False
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+_client = None
+
+
+def _get_client():
+    """Return the shared Redis client, creating it on first use."""
+    global _client
+    if _client is None and HAS_REDIS and settings.REDIS_URL:
+        _client = redis_asyncio.from_url(settings.REDIS_URL)
+    return _client
+
+
+# Writes bump a per-user version and only SET if the version read alongside the cache
+# miss is still current, so a list read that races a write can't cache the pre-write
+# payload. Both keys share a hash tag to stay in one slot on Redis Cluster.
+_SET_IF_VERSION_SCRIPT = """
+if (redis.call('GET', KEYS[1]) or '') == ARGV[1] then
+    redis.call('SET', KEYS[2], ARGV[2], 'EX', ARGV[3])
+    return 1
+end
+return 0
+"""
+_set_if_version = None
+
+
+def _keys(user_id: Union[str, uuid.UUID]) -> Tuple[str, str]:
+    """Return the (version key, payload key) for a user, normalizing str and UUID ids."""
+    user_part = str(uuid.UUID(str(user_id)))
+    return f"tasks:{{{user_part}}}:version", f"tasks:{{{user_part}}}"
+
+
+async def get_cached_tasks(user_id: Union[str, uuid.UUID]) -> Tuple[Optional[bytes], Optional[bytes]]:
+    """
+    Return (cached JSON task list or None, current version) for a user. Pass the version
+    to set_cached_tasks after loading the list on a miss.
+    """
+    client = _get_client()
+    if client is None:
+        return None, None
+    try:
+        version_key, payload_key = _keys(user_id)
+        version, payload = await client.mget(version_key, payload_key)
+        return payload, version
+    except Exception as e:
+        logger.warning(f"Task cache read failed for user {user_id}: {e}")
+        return None, None
+
+
+async def set_cached_tasks(user_id: Union[str, uuid.UUID], payload: bytes, version: Optional[bytes]) -> None:
+    """Store a user's JSON task list with the configured TTL unless a write bumped its version."""
+    global _set_if_version
+    client = _get_client()
+    if client is None:
+        return
+    try:
+        if _set_if_version is None:
+            _set_if_version = client.register_script(_SET_IF_VERSION_SCRIPT)
+        await _set_if_version(
+            keys=list(_keys(user_id)),
+            args=[version or b"", payload, settings.TASKS_CACHE_TTL_SECONDS],
+        )
+    except Exception as e:
+        logger.warning(f"Task cache write failed for user {user_id}: {e}")
+
+
+async def invalidate_tasks(user_id: Union[str, uuid.UUID]) -> None:
+    """Drop a user's cached task list after a write and bump its version."""
+    client = _get_client()
+    if client is None:
+        return
+    try:
+        version_key, payload_key = _keys(user_id)
+        async with client.pipeline(transaction=True) as pipe:
+            pipe.incr(version_key)
+            pipe.delete(payload_key)
+            await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Task cache invalidation failed for user {user_id}: {e}")
+
+
+async def close_tasks_cache() -> None:
+    """Close the Redis connection pool on application shutdown."""
+    global _client, _set_if_version
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+        _set_if_version = None
@@ -35,6 +35,15 @@ class Settings(BaseSettings):
     JWT_SECRET_KEY: str = "your-secret-key-change-in-production"
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    TOKEN_BLACKLIST_CLEANUP_INTERVAL_SECONDS: int = 600
+    TOKEN_BLACKLIST_REFRESH_INTERVAL_SECONDS: int = 30
+
+    # Password hashing work factor (bcrypt log2 rounds)
+    BCRYPT_ROUNDS: int = 12
+
+    # Cache settings (task list caching is disabled when REDIS_URL is empty)
+    REDIS_URL: str = ""
+    TASKS_CACHE_TTL_SECONDS: int = 30
 
     # CORS settings
     ALLOWED_ORIGINS: str = "http://localhost:3000,http://localhost:3001,http://localhost:8000"
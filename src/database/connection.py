@@ -170,19 +170,34 @@ def apply_ipv4_resolution(db_url: str) -> str:
 async_db_url = apply_ipv4_resolution(async_db_url)
 sync_db_url = apply_ipv4_resolution(sync_db_url)
 
+# Statement caching: SQLAlchemy keeps a compiled-statement LRU sized by DB_QUERY_CACHE_SIZE.
+# psycopg's server-side prepared statements keep its own default unless DB_PREPARE_THRESHOLD
+# is set; don't lower it behind PgBouncer transaction pooling (e.g. Neon "-pooler" hosts),
+# where prepared statements fail with "prepared statement ... does not exist".
+async_connect_args = {}
+if async_db_url.startswith("postgresql+psycopg") and os.environ.get("DB_PREPARE_THRESHOLD"):
+    async_connect_args["prepare_threshold"] = int(os.environ["DB_PREPARE_THRESHOLD"])
+
 # Create async engine
 async_engine = create_async_engine(
     async_db_url,
     echo=os.environ.get("DB_ECHO", "False").lower() == "true",  # Set to True for debugging
-    pool_size=int(os.environ.get("DB_POOL_SIZE", "5")),
+    pool_size=int(os.environ.get("DB_POOL_SIZE", "20")),
     max_overflow=int(os.environ.get("DB_MAX_OVERFLOW", "10")),
-    pool_pre_ping=True,  # Verify connections before use
+    pool_timeout=int(os.environ.get("DB_POOL_TIMEOUT", "30")),  # Seconds to wait for a free connection
+    # Verify connections before use; disable behind a pooler such as PgBouncer that already does
+    pool_pre_ping=os.environ.get("DB_POOL_PRE_PING", "True").lower() == "true",
     pool_recycle=int(os.environ.get("DB_POOL_RECYCLE", "300")),  # Recycle connections after 5 minutes
+    query_cache_size=int(os.environ.get("DB_QUERY_CACHE_SIZE", "1000")),
+    connect_args=async_connect_args,
 )
 
 
 # Create sync engine for sync operations (migrations, etc.)
 # Using psycopg (v3) driver for Python 3.13 compatibility
+# Request traffic goes through async_engine; this engine only serves startup and
+# maintenance work, so it deliberately keeps its smaller default pool (5) and is not
+# tuned with the async pool settings above.
 sync_engine = create_engine(
     sync_db_url,
     echo=os.environ.get("DB_ECHO", "False").lower() == "true",
@@ -11,6 +11,7 @@ from typing import AsyncGenerator
 
 from fastapi import FastAPI, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import jwt
 from sqlmodel import SQLModel, create_engine
@@ -22,7 +23,12 @@ from .models import *  # Import all models to ensure they are registered
 from .routers import auth, tasks  # Import your routers
 from .api import auth as api_auth, tasks as api_tasks  # Import the new API endpoints
 from .api.chat import router as chat_router # Import chat API
+from .services.agent import close_gemini_client
 from .config import settings
+from .auth.asgi_auth import AuthMiddleware
+from .cache.tasks_cache import close_tasks_cache
+from .utils.log_queue import start_queue_logging, stop_queue_logging
+from .utils.auth import run_blacklist_cleanup
 
 
 # Create async context manager for lifespan events
@@ -32,6 +38,7 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     Handle application startup and shutdown events.
     """
     # Startup
+    start_queue_logging()
     print("Application starting up...")
     loop = asyncio.get_running_loop()
     print(f"Current event loop: {type(loop)}")
@@ -40,9 +47,19 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
         print("Database initialized successfully.")
     except Exception as e:
         print(f"Error initializing database: {e}")
+    # Load the in-process blacklist and purge expired entries off the request path
+    blacklist_cleanup = asyncio.create_task(run_blacklist_cleanup())
     yield
     # Shutdown
     print("Application shutting down...")
+    blacklist_cleanup.cancel()
+    try:
+        await blacklist_cleanup
+    except asyncio.CancelledError:
+        pass
+    await close_tasks_cache()
+    await close_gemini_client()
+    stop_queue_logging()
 
 
 # Create FastAPI app instance
@@ -50,7 +67,8 @@ app = FastAPI(
     title="Todo API",
     description="A FastAPI application for managing todos with AI assistance",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 
@@ -65,6 +83,10 @@ app.add_middleware(
 )
 
 
+# Verify bearer tokens once per request for routes using get_current_user_id
+app.add_middleware(AuthMiddleware)
+
+
 # Security scheme for JWT
 security = HTTPBearer()
 
@@ -121,10 +143,17 @@ if __name__ == "__main__":
     import uvicorn
     # Use PORT from environment or default to 8000 for consistency with Docker
     port = int(os.getenv("PORT", "8000"))
+    # uvloop ships with uvicorn[standard] but not on Windows, where the selector loop above is used
+    try:
+        import uvloop  # noqa: F401
+        loop = "uvloop"
+    except ImportError:
+        loop = "asyncio"
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
         port=port,
         reload=True,
-        log_level="info"
+        log_level="info",
+        loop=loop
     )
\ No newline at end of file
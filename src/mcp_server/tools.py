@@ -21,12 +21,13 @@ import json
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy import and_
-from ..models.task import Task
+from ..models.task import Task, TaskRead
 from ..database.connection import get_async_session
+from ..cache.tasks_cache import invalidate_tasks
 from ..config import settings
 from contextlib import asynccontextmanager
 import time
-from collections import defaultdict
+from collections import OrderedDict
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -34,26 +35,43 @@ logger = logging.getLogger(__name__)
 
 # Rate limiting implementation
 class RateLimiter:
-    def __init__(self, max_requests: int = 10, window_seconds: int = 60):
+    def __init__(self, max_requests: int = 10, window_seconds: int = 60, max_users: int = 10000):
         self.max_requests = max_requests
         self.window_seconds = window_seconds
-        self.requests = defaultdict(list)
+        self.max_users = max_users
+        # Buckets are kept in least-recently-used order so idle users can be evicted cheaply
+        self.requests: "OrderedDict[str, List[float]]" = OrderedDict()
+
+    def _evict_idle(self, current_time: float) -> None:
+        """Drop buckets that are idle past the window or exceed the size bound."""
+        while self.requests:
+            oldest_user, oldest_requests = next(iter(self.requests.items()))
+            # An empty bucket (every request rejected, e.g. max_requests=0) holds nothing to keep
+            is_idle = not oldest_requests or current_time - oldest_requests[-1] >= self.window_seconds
+            if not is_idle and len(self.requests) <= self.max_users:
+                break
+            del self.requests[oldest_user]
 
     def is_allowed(self, user_id: str) -> bool:
         """Check if a user is allowed to make a request."""
-        current_time = time.time()
+        # Monotonic clock so wall-clock adjustments cannot distort the window
+        current_time = time.monotonic()
         # Clean old requests outside the window
-        self.requests[user_id] = [
-            req_time for req_time in self.requests[user_id]
+        user_requests = [
+            req_time for req_time in self.requests.pop(user_id, ())
             if current_time - req_time < self.window_seconds
         ]
 
         # Check if user has exceeded the limit
-        if len(self.requests[user_id]) >= self.max_requests:
+        if len(user_requests) >= self.max_requests:
+            self.requests[user_id] = user_requests
+            self._evict_idle(current_time)
             return False
 
         # Add current request
-        self.requests[user_id].append(current_time)
+        user_requests.append(current_time)
+        self.requests[user_id] = user_requests
+        self._evict_idle(current_time)
         return True
 
 # Global rate limiter instance
@@ -89,13 +107,33 @@ async def validate_user_access(session: AsyncSession, user_id: str, task_id: Opt
     return user_id is not None and len(user_id) > 0
 
 
-# Define core functions that can be used by both agent and MCP tools
-async def add_task_core(params: Dict[str, Any]) -> Dict[str, Any]:
+# Tool payload key -> TaskRead field. The payload keys predate TaskRead and agent
+# prompts and MCP clients read them, so they are kept as-is.
+_TOOL_TASK_KEYS = {
+    "id": "task_id",
+    "title": "title",
+    "description": "description",
+    "completed": "is_completed",
+    "user_id": "user_id",
+    "created_at": "created_at",
+    "updated_at": "updated_at",
+}
+_TOOL_TASK_FIELDS = frozenset(_TOOL_TASK_KEYS.values())
+
+
+def _task_to_dict(task: Task) -> Dict[str, Any]:
+    """Serialize a task into a JSON-ready tool payload using the TaskRead schema."""
+    data = TaskRead.model_validate(task, from_attributes=True).model_dump(
+        mode="json", include=_TOOL_TASK_FIELDS
+    )
+    return {key: data[field] for key, field in _TOOL_TASK_KEYS.items()}
+
+
+# Define core functions that can be used by both agent and MCP tools.
+# They take keyword arguments so the agent can call them without building a params dict;
+# MCP handlers unpack the tool-call arguments into them.
+async def add_task_core(*, title: str, user_id: str, description: Optional[str] = None) -> Dict[str, Any]:
     """Core function to add a task."""
-    title = params["title"]
-    description = params.get("description")
-    user_id = params["user_id"]
-
     # Check rate limit
     if not rate_limiter.is_allowed(user_id):
         logger.warning(f"Rate limit exceeded for user {user_id}")
@@ -121,6 +159,7 @@ async def add_task_core(params: Dict[str, Any]) -> Dict[str, Any]:
 
         session.add(task)
         await session.commit()
+        await invalidate_tasks(user_id)
         await session.refresh(task)
 
         logger.info(f"Successfully added task {task.task_id} for user {user_id}")
@@ -128,23 +167,26 @@ async def add_task_core(params: Dict[str, Any]) -> Dict[str, Any]:
         return {
             "success": True,
             "task_id": str(task.task_id),
-            "task": {
-                "id": str(task.task_id),
-                "title": task.title,
-                "description": task.description,
-                "completed": task.is_completed,
-                "user_id": str(task.user_id),
-                "created_at": task.created_at.isoformat(),
-                "updated_at": task.updated_at.isoformat()
-            }
+            "task": _task_to_dict(task)
         }
 
 
-async def list_tasks_core(params: Dict[str, Any]) -> Dict[str, Any]:
-    """Core function to list tasks."""
-    user_id = params["user_id"]
-    filters = params.get("filters", {})
+async def _list_all_tasks(session: AsyncSession, user_id) -> List[Task]:
+    """Fetch every task owned by the user."""
+    result = await session.exec(select(Task).where(Task.user_id == user_id))
+    return result.all()
+
+
+async def _list_tasks_by_completed(session: AsyncSession, user_id, completed: bool) -> List[Task]:
+    """Fetch the user's tasks matching the given completion status."""
+    result = await session.exec(
+        select(Task).where((Task.user_id == user_id) & (Task.is_completed == completed))
+    )
+    return result.all()
+
 
+async def list_tasks_core(*, user_id: str, filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Core function to list tasks."""
     # Check rate limit
     if not rate_limiter.is_allowed(user_id):
         logger.warning(f"Rate limit exceeded for user {user_id}")
@@ -161,29 +203,16 @@ async def list_tasks_core(params: Dict[str, Any]) -> Dict[str, Any]:
             import uuid
             user_id = uuid.UUID(user_id)
 
-        # Build query with filters
-        query = select(Task).where(Task.user_id == user_id)
-
-        if "completed" in filters:
-            query = query.where(Task.is_completed == filters["completed"])
+        # Most calls are unfiltered, so only take the filtered path when asked
+        if filters and "completed" in filters:
             logger.debug(f"Applying completed filter: {filters['completed']}")
-
-        result = await session.exec(query)
-        tasks = result.all()
+            tasks = await _list_tasks_by_completed(session, user_id, filters["completed"])
+        else:
+            tasks = await _list_all_tasks(session, user_id)
 
         logger.info(f"Found {len(tasks)} tasks for user {user_id}")
 
-        tasks_list = []
-        for task in tasks:
-            tasks_list.append({
-                "id": str(task.task_id),
-                "title": task.title,
-                "description": task.description,
-                "completed": task.is_completed,
-                "user_id": str(task.user_id),
-                "created_at": task.created_at.isoformat(),
-                "updated_at": task.updated_at.isoformat()
-            })
+        tasks_list = [_task_to_dict(task) for task in tasks]
 
         return {
             "success": True,
@@ -191,12 +220,8 @@ async def list_tasks_core(params: Dict[str, Any]) -> Dict[str, Any]:
         }
 
 
-async def complete_task_core(params: Dict[str, Any]) -> Dict[str, Any]:
+async def complete_task_core(*, task_id, user_id: str, completed: bool) -> Dict[str, Any]:
     """Core function to complete a task."""
-    task_id = params["task_id"]
-    user_id = params["user_id"]
-    completed = params["completed"]
-
     # Check rate limit
     if not rate_limiter.is_allowed(user_id):
         logger.warning(f"Rate limit exceeded for user {user_id}")
@@ -235,31 +260,19 @@ async def complete_task_core(params: Dict[str, Any]) -> Dict[str, Any]:
             
         session.add(task)
         await session.commit()
+        await invalidate_tasks(user_id)
         await session.refresh(task)
 
         logger.info(f"Successfully updated task {task.task_id} completion status for user {user_id}")
 
         return {
             "success": True,
-            "task": {
-                "id": str(task.task_id),
-                "title": task.title,
-                "description": task.description,
-                "completed": task.is_completed,
-                "user_id": str(task.user_id),
-                "created_at": task.created_at.isoformat(),
-                "updated_at": task.updated_at.isoformat()
-            }
+            "task": _task_to_dict(task)
         }
 
 
-async def update_task_core(params: Dict[str, Any]) -> Dict[str, Any]:
+async def update_task_core(*, task_id, user_id: str, title: Optional[str] = None, description: Optional[str] = None) -> Dict[str, Any]:
     """Core function to update a task."""
-    task_id = params["task_id"]
-    user_id = params["user_id"]
-    title = params.get("title")
-    description = params.get("description")
-
     # Check rate limit
     if not rate_limiter.is_allowed(user_id):
         logger.warning(f"Rate limit exceeded for user {user_id}")
@@ -292,29 +305,19 @@ async def update_task_core(params: Dict[str, Any]) -> Dict[str, Any]:
 
         session.add(task)
         await session.commit()
+        await invalidate_tasks(user_id)
         await session.refresh(task)
 
         logger.info(f"Successfully updated task {task.task_id} for user {user_id}")
 
         return {
             "success": True,
-            "task": {
-                "id": str(task.task_id),
-                "title": task.title,
-                "description": task.description,
-                "completed": task.is_completed,
-                "user_id": str(task.user_id),
-                "created_at": task.created_at.isoformat(),
-                "updated_at": task.updated_at.isoformat()
-            }
+            "task": _task_to_dict(task)
         }
 
 
-async def delete_task_core(params: Dict[str, Any]) -> Dict[str, Any]:
+async def delete_task_core(*, task_id, user_id: str) -> Dict[str, Any]:
     """Core function to delete a task."""
-    task_id = params["task_id"]
-    user_id = params["user_id"]
-
     # Check rate limit
     if not rate_limiter.is_allowed(user_id):
         logger.warning(f"Rate limit exceeded for user {user_id}")
@@ -346,6 +349,7 @@ async def delete_task_core(params: Dict[str, Any]) -> Dict[str, Any]:
         # Delete the task
         await session.delete(task)
         await session.commit()
+        await invalidate_tasks(user_id)
 
         logger.info(f"Successfully deleted task {task_id} for user {user_id}")
 
@@ -356,74 +360,30 @@ async def delete_task_core(params: Dict[str, Any]) -> Dict[str, Any]:
 
 
 # MCP Server Handlers
-async def add_task_handler(context, params: Dict[str, Any]) -> CallToolResult:
-    """MCP handler for adding a task."""
-    try:
-        result = await add_task_core(params)
-        return CallToolResult(
-            content=[TextContent(type="text", text=json.dumps(result))]
-        )
-    except Exception as e:
-        return CallToolResult(
-            content=[TextContent(type="text", text=json.dumps({"error": str(e)}))],
-            isError=True
-        )
-
-
-async def list_tasks_handler(context, params: Dict[str, Any]) -> CallToolResult:
-    """MCP handler for listing tasks."""
-    try:
-        result = await list_tasks_core(params)
-        return CallToolResult(
-            content=[TextContent(type="text", text=json.dumps(result))]
-        )
-    except Exception as e:
-        return CallToolResult(
-            content=[TextContent(type="text", text=json.dumps({"error": str(e)}))],
-            isError=True
-        )
-
-
-async def complete_task_handler(context, params: Dict[str, Any]) -> CallToolResult:
-    """MCP handler for completing a task."""
-    try:
-        result = await complete_task_core(params)
-        return CallToolResult(
-            content=[TextContent(type="text", text=json.dumps(result))]
-        )
-    except Exception as e:
-        return CallToolResult(
-            content=[TextContent(type="text", text=json.dumps({"error": str(e)}))],
-            isError=True
-        )
-
-
-async def update_task_handler(context, params: Dict[str, Any]) -> CallToolResult:
-    """MCP handler for updating a task."""
-    try:
-        result = await update_task_core(params)
-        return CallToolResult(
-            content=[TextContent(type="text", text=json.dumps(result))]
-        )
-    except Exception as e:
-        return CallToolResult(
-            content=[TextContent(type="text", text=json.dumps({"error": str(e)}))],
-            isError=True
-        )
-
-
-async def delete_task_handler(context, params: Dict[str, Any]) -> CallToolResult:
-    """MCP handler for deleting a task."""
-    try:
-        result = await delete_task_core(params)
-        return CallToolResult(
-            content=[TextContent(type="text", text=json.dumps(result))]
-        )
-    except Exception as e:
-        return CallToolResult(
-            content=[TextContent(type="text", text=json.dumps({"error": str(e)}))],
-            isError=True
-        )
+def _make_handler(core_func):
+    """Wrap a core function as an MCP handler returning a CallToolResult."""
+    async def handler(context, params: Dict[str, Any]) -> CallToolResult:
+        try:
+            result = await core_func(**params)
+            return CallToolResult(
+                content=[TextContent(type="text", text=json.dumps(result))]
+            )
+        except Exception as e:
+            return CallToolResult(
+                content=[TextContent(type="text", text=json.dumps({"error": str(e)}))],
+                isError=True
+            )
+
+    handler.__name__ = core_func.__name__.replace("_core", "_handler")
+    handler.__doc__ = f"MCP handler for {core_func.__name__}."
+    return handler
+
+
+add_task_handler = _make_handler(add_task_core)
+list_tasks_handler = _make_handler(list_tasks_core)
+complete_task_handler = _make_handler(complete_task_core)
+update_task_handler = _make_handler(update_task_core)
+delete_task_handler = _make_handler(delete_task_core)
 
 
 # Register tools with the MCP server using the available method
@@ -1,4 +1,5 @@
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Index
 from datetime import datetime
 from typing import Optional
 import uuid
@@ -29,9 +30,11 @@ class TaskBase(SQLModel):
 class Task(TaskBase, table=True):
     """Task model for the application"""
     __tablename__ = "tasks"
+    # Serves the per-user listings filtered by completion status
+    __table_args__ = (Index("ix_tasks_user_id_is_completed", "user_id", "is_completed"),)
 
     task_id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
-    user_id: uuid.UUID = Field(foreign_key="users.user_id", nullable=False)
+    user_id: uuid.UUID = Field(foreign_key="users.user_id", nullable=False, index=True)
     title: str = Field(max_length=200, nullable=False)
     description: Optional[str] = Field(default=None)
     is_completed: bool = Field(default=False)
@@ -1,4 +1,5 @@
 from sqlmodel import SQLModel, Field, create_engine, Session
+from sqlalchemy import Index
 from datetime import datetime
 import uuid
 
@@ -6,7 +7,7 @@ import uuid
 class TokenBlacklistBase(SQLModel):
     """Base model for blacklisted tokens"""
     jti: str = Field(unique=True, index=True, nullable=False)  # JWT ID
-    token: str = Field(nullable=False)  # The actual token (hashed for security)
+    token: bytes = Field(nullable=False)  # BLAKE2b digest of the token (never the token itself)
     expires_at: datetime = Field(nullable=False)  # When the original token would expire
     blacklisted_at: datetime = Field(default_factory=datetime.utcnow)  # When it was blacklisted
     reason: str = Field(default="logout")  # Reason for blacklisting
@@ -15,10 +16,14 @@ class TokenBlacklistBase(SQLModel):
 class TokenBlacklist(TokenBlacklistBase, table=True):
     """Model for storing blacklisted JWT tokens"""
     __tablename__ = "token_blacklist"
+    # Unique lookup index for blacklist checks; expires_at is included so the check is index-only on Postgres
+    __table_args__ = (
+        Index("ix_token_blacklist_token", "token", unique=True, postgresql_include=["expires_at"]),
+    )
 
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     jti: str = Field(unique=True, index=True, nullable=False)  # JWT ID
-    token: str = Field(nullable=False)  # The actual token (hashed for security)
+    token: bytes = Field(nullable=False)  # BLAKE2b digest of the token (never the token itself)
     expires_at: datetime = Field(nullable=False)  # When the original token would expire
     blacklisted_at: datetime = Field(default_factory=datetime.utcnow)  # When it was blacklisted
     reason: str = Field(default="logout")  # Reason for blacklisting
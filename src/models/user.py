@@ -1,4 +1,5 @@
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Index, text
 from datetime import datetime
 from typing import Optional
 import uuid
@@ -13,6 +14,10 @@ class UserBase(SQLModel):
 class User(UserBase, table=True):
     """User model for the application"""
     __tablename__ = "users"
+    # Functional unique index backing case-insensitive email lookups at login, so
+    # case variants of one address can't register twice. The plain unique index on
+    # email is kept for exact-match lookups; registration stores emails lowercased.
+    __table_args__ = (Index("ix_users_email_lower", text("lower(email)"), unique=True),)
 
     user_id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     email: str = Field(unique=True, index=True, nullable=False)
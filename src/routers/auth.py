@@ -5,19 +5,44 @@ from typing import Annotated, Optional
 import jwt
 import re
 from datetime import datetime, timedelta
-from sqlmodel import select
+from sqlmodel import select, func
+from sqlalchemy.exc import IntegrityError
 import logging
 
 from ..database import get_async_session
 from ..models import User, UserCreate, UserRead, UserLogin
 from ..config import settings
-from ..utils.auth import verify_password, hash_password, create_access_token, get_current_user
+from ..utils.auth import (
+    verify_password_async, hash_password_async, password_needs_rehash, create_access_token_for_user,
+    cache_user, get_current_user
+)
 from ..auth.better_auth_integration import BetterAuthJWTBearer
 
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Registration validation patterns, compiled once at import
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+_USERNAME_RE = re.compile(r'^[a-zA-Z0-9_-]{3,30}$')
+_PASSWORD_SPECIALS = frozenset("!@#$%^&*()_+-=[]{}|;:,.<>?")
+
+# Bit flags for the password character classes that must all be present
+_HAS_UPPER, _HAS_LOWER, _HAS_DIGIT, _HAS_SPECIAL = 1, 2, 4, 8
+_ALL_PASSWORD_CLASSES = _HAS_UPPER | _HAS_LOWER | _HAS_DIGIT | _HAS_SPECIAL
+
+# Access token lifetime, computed once at import
+_ACCESS_TOKEN_EXPIRES_SECONDS = settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+
+
+def _duplicate_user_detail(error: IntegrityError) -> str:
+    """Map a unique-constraint violation on the users table to a client-facing message."""
+    diag = getattr(error.orig, "diag", None)
+    constraint = getattr(diag, "constraint_name", None) or str(error.orig)
+    if "username" in constraint:
+        return "Username already taken"
+    return "Email already registered"
+
 
 @router.post("/register", response_model=UserRead, status_code=status.HTTP_201_CREATED)
 async def register_user(
@@ -33,16 +58,14 @@ async def register_user(
     try:
         # Validate input data with more robust validation
         # Email validation: basic format check
-        email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        if not re.match(email_pattern, user_data.email):
+        if not _EMAIL_RE.match(user_data.email):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Invalid email format"
             )
 
         # Username validation: alphanumeric and underscore/hyphen only, 3-30 chars
-        username_pattern = r'^[a-zA-Z0-9_-]{3,30}$'
-        if not re.match(username_pattern, user_data.username):
+        if not _USERNAME_RE.match(user_data.username):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Username must be 3-30 characters long and contain only letters, numbers, underscores, and hyphens"
@@ -56,49 +79,45 @@ async def register_user(
                 detail="Password must be at least 8 characters long"
             )
 
-        # Additional password complexity checks
-        has_upper = any(c.isupper() for c in password)
-        has_lower = any(c.islower() for c in password)
-        has_digit = any(c.isdigit() for c in password)
-        has_special = any(c in "!@#$%^&*()_+-=[]{}|;:,.<>?" for c in password)
-
-        if not (has_upper and has_lower and has_digit and has_special):
+        # Additional password complexity checks in a single pass over the password
+        char_classes = 0
+        for c in password:
+            if c.isupper():
+                char_classes |= _HAS_UPPER
+            elif c.islower():
+                char_classes |= _HAS_LOWER
+            elif c.isdigit():
+                char_classes |= _HAS_DIGIT
+            elif c in _PASSWORD_SPECIALS:
+                char_classes |= _HAS_SPECIAL
+            if char_classes == _ALL_PASSWORD_CLASSES:
+                break
+
+        if char_classes != _ALL_PASSWORD_CLASSES:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Password must contain at least one uppercase letter, one lowercase letter, one digit, and one special character"
             )
 
-        # Check if user already exists (email)
-        existing_user = await session.exec(
-            select(User).where(User.email == user_data.email)
-        )
-        if existing_user.first():
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already registered"
-            )
-
-        # Check if username already exists
-        existing_username = await session.exec(
-            select(User).where(User.username == user_data.username)
-        )
-        if existing_username.first():
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Username already taken"
-            )
-
-        # Hash the password securely
-        hashed_password = hash_password(user_data.password)
+        # Hash the password securely, off the event loop
+        hashed_password = await hash_password_async(user_data.password)
 
         # Create new user
         db_user = User(
-            email=user_data.email,
+            email=user_data.email.strip().lower(),
             username=user_data.username,
             hashed_password=hashed_password
         )
         session.add(db_user)
-        await session.commit()
+        try:
+            # Uniqueness is enforced by the users table indexes, so no pre-insert lookup is needed
+            await session.commit()
+        except IntegrityError as e:
+            await session.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=_duplicate_user_detail(e)
+            )
         await session.refresh(db_user)
 
         logger.info(f"New user registered: {db_user.email}")
@@ -128,11 +147,11 @@ async def login_user(
     try:
         # Find user by email
         result = await session.exec(
-            select(User).where(User.email == user_credentials.email)
+            select(User).where(func.lower(User.email) == user_credentials.email.strip().lower())
         )
         user = result.first()
 
-        if not user or not verify_password(user_credentials.password, user.hashed_password):
+        if not user or not await verify_password_async(user_credentials.password, user.hashed_password):
             logger.warning(f"Failed login attempt for email: {user_credentials.email}")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -140,19 +159,32 @@ async def login_user(
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
+        # Upgrade legacy password hashes (e.g. bcrypt to argon2id) while the plain password is at hand
+        if password_needs_rehash(user.hashed_password):
+            user.hashed_password = await hash_password_async(user_credentials.password)
+            session.add(user)
+            await session.commit()
+
+        # The client's next requests will authenticate as this user; skip their lookup
+        cache_user(user)
+
         # Create access token with user information
-        access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-        access_token = create_access_token(
-            data={"user_id": str(user.user_id)}, expires_delta=access_token_expires
-        )
+        access_token = create_access_token_for_user(str(user.user_id), _ACCESS_TOKEN_EXPIRES_SECONDS)
 
         logger.info(f"User logged in: {user.email}")
 
         return {
             "access_token": access_token,
             "token_type": "bearer",
-            "expires_in": settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,  # in seconds
-            "user": UserRead.model_validate(user)
+            "expires_in": _ACCESS_TOKEN_EXPIRES_SECONDS,  # in seconds
+            "user": UserRead.model_construct(
+                user_id=user.user_id,
+                email=user.email,
+                username=user.username,
+                created_at=user.created_at,
+                updated_at=user.updated_at,
+                is_active=user.is_active
+            )
         }
 
     except HTTPException:
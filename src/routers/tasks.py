@@ -1,22 +1,62 @@
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import List
 from sqlmodel import select
+from sqlalchemy import func, update
+import orjson
 import uuid
 
+from ..cache.tasks_cache import get_cached_tasks, set_cached_tasks, invalidate_tasks
 from ..database import get_async_session
-from ..models import Task, TaskCreate, TaskRead, TaskUpdate, TaskUpdateStatus, User
-from ..utils.auth import get_current_user
+from ..models import Task, TaskCreate, TaskRead, TaskUpdate, TaskUpdateStatus
+from ..utils.auth import get_current_user_id
 
 
 router = APIRouter()
 
 
-@router.post("/", response_model=TaskRead, status_code=status.HTTP_201_CREATED)
+def _to_task_read(task: Task) -> TaskRead:
+    """
+    Build the response schema from a trusted database row without re-running validation.
+
+    Routes declare response_model=None (documenting TaskRead via responses=) so FastAPI
+    does not validate the returned object a second time.
+    """
+    return TaskRead.model_construct(
+        task_id=task.task_id,
+        user_id=task.user_id,
+        title=task.title,
+        description=task.description,
+        is_completed=task.is_completed,
+        created_at=task.created_at,
+        updated_at=task.updated_at,
+        completed_at=task.completed_at,
+    )
+
+
+async def _get_owned_task(session: AsyncSession, task_id: uuid.UUID, user_id: uuid.UUID) -> Task:
+    """
+    Fetch a task owned by the given user, raising 404 if it does not exist or belongs to someone else.
+    """
+    result = await session.exec(
+        select(Task).where(Task.task_id == task_id, Task.user_id == user_id)
+    )
+    task = result.first()
+
+    if not task:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Task not found"
+        )
+
+    return task
+
+
+@router.post("/", response_model=None, responses={201: {"model": TaskRead}}, status_code=status.HTTP_201_CREATED)
 async def create_task(
     task: TaskCreate,
-    current_user: User = Depends(get_current_user),
+    current_user_id: uuid.UUID = Depends(get_current_user_id),
     session: AsyncSession = Depends(get_async_session)
 ):
     """
@@ -24,78 +64,84 @@ async def create_task(
     """
     db_task = Task(
         **task.model_dump(),
-        user_id=current_user.user_id
+        user_id=current_user_id
     )
     session.add(db_task)
     await session.commit()
     await session.refresh(db_task)
+    await invalidate_tasks(current_user_id)
 
-    return db_task
+    return _to_task_read(db_task)
 
 
-@router.get("/", response_model=List[TaskRead])
+@router.get("/", response_model=None, responses={200: {"model": List[TaskRead]}})
 async def read_tasks(
-    current_user: User = Depends(get_current_user),
+    current_user_id: uuid.UUID = Depends(get_current_user_id),
     session: AsyncSession = Depends(get_async_session)
 ):
     """
     Retrieve all tasks for the authenticated user.
     """
-    tasks = await session.exec(
-        select(Task).where(Task.user_id == current_user.user_id)
+    cached, cache_version = await get_cached_tasks(current_user_id)
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
+
+    # Fetch plain column tuples rather than hydrating full ORM instances
+    rows = await session.exec(
+        select(
+            Task.task_id,
+            Task.title,
+            Task.description,
+            Task.is_completed,
+            Task.created_at,
+            Task.updated_at,
+            Task.completed_at,
+        ).where(Task.user_id == current_user_id)
     )
-    return tasks.all()
-
-
-@router.get("/{task_id}", response_model=TaskRead)
+    # Rows come straight from the database, so serialize them without re-validation
+    payload = orjson.dumps([
+        {
+            "title": title,
+            "description": description,
+            "is_completed": is_completed,
+            "task_id": task_id,
+            "user_id": current_user_id,
+            "created_at": created_at,
+            "updated_at": updated_at,
+            "completed_at": completed_at,
+        }
+        for task_id, title, description, is_completed, created_at, updated_at, completed_at in rows.all()
+    ])
+    await set_cached_tasks(current_user_id, payload, cache_version)
+
+    return Response(content=payload, media_type="application/json")
+
+
+@router.get("/{task_id}", response_model=None, responses={200: {"model": TaskRead}})
 async def read_task(
     task_id: uuid.UUID,
-    current_user: User = Depends(get_current_user),
+    current_user_id: uuid.UUID = Depends(get_current_user_id),
     session: AsyncSession = Depends(get_async_session)
 ):
     """
     Retrieve a specific task by ID.
     """
-    task = await session.get(Task, task_id)
-
-    if not task:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Task not found"
-        )
-
-    if task.user_id != current_user.user_id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to access this task"
-        )
+    task = await _get_owned_task(session, task_id, current_user_id)
 
-    return task
+    return _to_task_read(task)
 
 
-@router.put("/{task_id}", response_model=TaskRead)
+@router.put("/{task_id}", response_model=None, responses={200: {"model": TaskRead}})
 async def update_task(
     task_id: uuid.UUID,
     task_update: TaskUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user_id: uuid.UUID = Depends(get_current_user_id),
     session: AsyncSession = Depends(get_async_session)
 ):
     """
     Update a specific task by ID.
     """
-    db_task = await session.get(Task, task_id)
-
-    if not db_task:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Task not found"
-        )
-
-    if db_task.user_id != current_user.user_id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to update this task"
-        )
+    db_task = await _get_owned_task(session, task_id, current_user_id)
 
     # Update task fields
     for field, value in task_update.model_dump(exclude_unset=True).items():
@@ -104,24 +150,41 @@ async def update_task(
     # Update the updated_at timestamp
     db_task.updated_at = datetime.utcnow()
 
-    session.add(db_task)
+    # The task is already attached and every changed column was set above, so commit
+    # without session.add or a refresh SELECT (sessions use expire_on_commit=False)
     await session.commit()
-    await session.refresh(db_task)
+    await invalidate_tasks(current_user_id)
 
-    return db_task
+    return _to_task_read(db_task)
 
 
-@router.patch("/{task_id}/status", response_model=TaskRead)
+@router.patch("/{task_id}/status", response_model=None, responses={200: {"model": TaskRead}})
 async def update_task_status(
     task_id: uuid.UUID,
     status_update: TaskUpdateStatus,
-    current_user: User = Depends(get_current_user),
+    current_user_id: uuid.UUID = Depends(get_current_user_id),
     session: AsyncSession = Depends(get_async_session)
 ):
     """
     Update the completion status of a specific task.
     """
-    db_task = await session.get(Task, task_id)
+    now = datetime.utcnow()
+
+    # Keep an existing completed_at when re-completing; clear it when reopening
+    completed_at = func.coalesce(Task.completed_at, now) if status_update.is_completed else None
+
+    # Apply the change and read the row back in a single UPDATE ... RETURNING round trip
+    result = await session.execute(
+        update(Task)
+        .where(Task.task_id == task_id, Task.user_id == current_user_id)
+        .values(
+            is_completed=status_update.is_completed,
+            completed_at=completed_at,
+            updated_at=now,
+        )
+        .returning(Task)
+    )
+    db_task = result.scalars().one_or_none()
 
     if not db_task:
         raise HTTPException(
@@ -129,53 +192,23 @@ async def update_task_status(
             detail="Task not found"
         )
 
-    if db_task.user_id != current_user.user_id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to update this task"
-        )
-
-    # Update completion status
-    db_task.is_completed = status_update.is_completed
-
-    # Update completed_at timestamp if task is being marked as completed
-    if status_update.is_completed and not db_task.completed_at:
-        db_task.completed_at = datetime.utcnow()
-    elif not status_update.is_completed:
-        db_task.completed_at = None
-
-    # Update the updated_at timestamp
-    db_task.updated_at = datetime.utcnow()
-
-    session.add(db_task)
     await session.commit()
-    await session.refresh(db_task)
+    await invalidate_tasks(current_user_id)
 
-    return db_task
+    return _to_task_read(db_task)
 
 
 @router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_task(
     task_id: uuid.UUID,
-    current_user: User = Depends(get_current_user),
+    current_user_id: uuid.UUID = Depends(get_current_user_id),
     session: AsyncSession = Depends(get_async_session)
 ):
     """
     Delete a specific task by ID.
     """
-    db_task = await session.get(Task, task_id)
-
-    if not db_task:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Task not found"
-        )
-
-    if db_task.user_id != current_user.user_id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to delete this task"
-        )
+    db_task = await _get_owned_task(session, task_id, current_user_id)
 
     await session.delete(db_task)
-    await session.commit()
\ No newline at end of file
+    await session.commit()
+    await invalidate_tasks(current_user_id)
\ No newline at end of file
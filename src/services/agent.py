@@ -1,12 +1,20 @@
 """Agent service using OpenAI Agent SDK to integrate with MCP tools for task management."""
 
-import json
+import asyncio
+import functools
+import inspect
+import itertools
+import logging
 import os
-from typing import Dict, Any, Optional, List
+import time
+import httpx
+import orjson
+from dotenv import load_dotenv
+from typing import Awaitable, Callable, Dict, Any, Optional, List, Tuple
 from openai import AsyncOpenAI
 
 try:
-    from agents import Agent, Runner, OpenAIChatCompletionsModel
+    from agents import Agent, ModelSettings, Runner, OpenAIChatCompletionsModel, RunContextWrapper
     from agents.tool import function_tool
     HAS_AGENTS = True
 except ImportError:
@@ -14,222 +22,291 @@ except ImportError:
     # Mock function_tool decorator
     def function_tool(func):
         return func
-    print("Warning: 'openai-agents' module not found. Agent functionality will be disabled.")
+    logging.getLogger(__name__).warning("'openai-agents' module not found. Agent functionality will be disabled.")
 
 from ..mcp_server.tools import (
     add_task, list_tasks, complete_task, update_task, delete_task
 )
 
+logger = logging.getLogger(__name__)
 
-@function_tool
-async def add_task_tool(title: str, user_id: str, description: Optional[str] = None) -> Dict[str, Any]:
+# Read Gemini settings once at import so agent construction never touches .env or os.environ
+load_dotenv()
+_GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY")
+_GEMINI_MODEL_NAME = os.environ.get("GEMINI_MODEL_NAME", "gemini-2.5-flash")
+
+
+async def _call_tool(call: Awaitable[Any], error_message: str) -> Dict[str, Any]:
     """
-    Add a new task to the user's todo list.
+    Await a task tool call and normalize its result to a dictionary.
 
-    Args:
-        title: Title of the task
-        user_id: ID of the user creating the task
-        description: Description of the task (optional)
+    Core functions return dictionaries directly; MCP handlers return a CallToolResult
+    whose first content item carries the JSON payload (see _unwrap_tool_result).
     """
-    params = {"title": title, "description": description, "user_id": user_id}
     try:
-        result = await add_task(params)
-    except Exception as e:
-        print(f"DEBUG: Error in add_task_tool: {e}")
-        import traceback
-        traceback.print_exc()
+        result = await call
+    except Exception:
+        # exc_info is only formatted when DEBUG logging is enabled
+        logger.debug("Error in %s", getattr(call, "__qualname__", call), exc_info=True)
         raise
+    return _unwrap_tool_result(result, error_message)
+
 
-    # If the result is already a dictionary (direct core function call), return it
-    if isinstance(result, dict):
+def _unwrap_tool_result(result: Any, error_message: str) -> Dict[str, Any]:
+    """Return a tool result as a dictionary, decoding MCP CallToolResult payloads."""
+    # Core functions return plain dicts; check the exact type to skip isinstance's MRO walk
+    if type(result) is dict:
         return result
 
     # Parse the result from the CallToolResult content (if it's an MCP result)
-    if hasattr(result, 'content') and result.content:
-        text_content = result.content[0]  # Get first content item
-        content = json.loads(text_content.text)
-        if hasattr(result, 'isError') and result.isError:
-            raise Exception(content.get("error", "Failed to add task"))
-        return content
+    content_items = getattr(result, 'content', None)
+    if not content_items:
+        raise Exception(f"{error_message} - no content in result")
+    content = orjson.loads(content_items[0].text)
+    if getattr(result, 'isError', False):
+        raise Exception(content.get("error", error_message))
+    return content
+
+
+# Short-lived cache of list_tasks_tool results keyed by (user_id, completed filter).
+# The agent often re-lists tasks before each operation within a turn; mutating tools
+# drop the user's entries, and the TTL bounds staleness from writes made elsewhere.
+LIST_TASKS_CACHE_TTL_SECONDS = 5.0
+LIST_TASKS_CACHE_MAX_SIZE = 4096
+_list_tasks_cache: Dict[Tuple[str, Optional[bool]], Tuple[float, Dict[str, Any]]] = {}
+
+# Per-user write generation. A listing is cached (and shared with concurrent callers)
+# only under the generation captured before its query, so a write that lands while
+# the listing is in flight keeps its pre-write snapshot out of the cache. Values come
+# from one process-wide counter, so dropping an entry never revives an old generation.
+_list_tasks_generations: Dict[str, int] = {}
+_next_list_tasks_generation = itertools.count(1)
+
+
+def _invalidate_list_tasks_cache(user_id: str) -> None:
+    """Drop every cached task listing for a user after a write."""
+    if len(_list_tasks_generations) >= LIST_TASKS_CACHE_MAX_SIZE:
+        _list_tasks_generations.clear()
+    _list_tasks_generations[user_id] = next(_next_list_tasks_generation)
+    for completed in (None, True, False):
+        _list_tasks_cache.pop((user_id, completed), None)
+
+
+def _store_list_tasks_result(key: Tuple[str, Optional[bool]], result: Dict[str, Any]) -> None:
+    """Cache a listing, pruning expired entries when the cache is full."""
+    now = time.monotonic()
+    if len(_list_tasks_cache) >= LIST_TASKS_CACHE_MAX_SIZE:
+        for stale_key in [k for k, (expires_at, _) in _list_tasks_cache.items() if expires_at <= now]:
+            del _list_tasks_cache[stale_key]
+        if len(_list_tasks_cache) >= LIST_TASKS_CACHE_MAX_SIZE:
+            _list_tasks_cache.clear()
+    _list_tasks_cache[key] = (now + LIST_TASKS_CACHE_TTL_SECONDS, result)
+
+
+# In-flight read calls keyed by tool name and arguments; concurrent identical
+# calls await the same future instead of each querying the database.
+_inflight_calls: Dict[Tuple, "asyncio.Future[Dict[str, Any]]"] = {}
+
+
+async def _single_flight(key: Tuple, call: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+    """Run call() once for concurrent callers sharing the same key. Only use for reads."""
+    pending = _inflight_calls.get(key)
+    if pending is not None:
+        return await asyncio.shield(pending)
+
+    future = asyncio.get_running_loop().create_future()
+    # Mark the outcome as retrieved even when no other caller is waiting on it
+    future.add_done_callback(lambda f: f.cancelled() or f.exception())
+    _inflight_calls[key] = future
+    try:
+        result = await call()
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as e:
+        future.set_exception(e)
+        raise
     else:
-        raise Exception("Failed to add task - no content in result")
+        future.set_result(result)
+        return result
+    finally:
+        del _inflight_calls[key]
 
 
 @function_tool
-async def list_tasks_tool(user_id: str, completed: Optional[bool] = None) -> Dict[str, Any]:
+async def add_task_tool(ctx: "RunContextWrapper[Dict[str, Any]]", title: str, description: Optional[str] = None) -> Dict[str, Any]:
     """
-    List all tasks for a specific user.
+    Add a new task to the user's todo list.
 
     Args:
-        user_id: ID of the user whose tasks to list
-        completed: Filter by completion status (optional)
+        title: Title of the task
+        description: Description of the task (optional)
     """
-    filters = {}
-    if completed is not None:
-        filters["completed"] = completed
-    params = {"user_id": user_id, "filters": filters}
+    user_id = ctx.context["user_id"]
     try:
-        result = await list_tasks(params)
-    except Exception as e:
-        print(f"DEBUG: Error in list_tasks_tool: {e}")
-        import traceback
-        traceback.print_exc()
-        raise
+        return await _call_tool(
+            add_task(title=title, description=description, user_id=user_id),
+            "Failed to add task"
+        )
+    finally:
+        _invalidate_list_tasks_cache(user_id)
 
-    # If the result is already a dictionary (direct core function call), return it
-    if isinstance(result, dict):
-        return result
 
-    # Parse the result from the CallToolResult content
-    if hasattr(result, 'content') and result.content:
-        text_content = result.content[0]  # Get first content item
-        content = json.loads(text_content.text)
-        if hasattr(result, 'isError') and result.isError:
-            raise Exception(content.get("error", "Failed to list tasks"))
-        return content
-    else:
-        raise Exception("Failed to list tasks - no content in result")
+@function_tool
+async def list_tasks_tool(ctx: "RunContextWrapper[Dict[str, Any]]", completed: Optional[bool] = None) -> Dict[str, Any]:
+    """
+    List all tasks for the current user.
+
+    Args:
+        completed: Filter by completion status (optional)
+    """
+    user_id = ctx.context["user_id"]
+    cache_key = (user_id, completed)
+    cached = _list_tasks_cache.get(cache_key)
+    if cached is not None and time.monotonic() < cached[0]:
+        return cached[1]
+
+    filters = {"completed": completed} if completed is not None else None
+    generation = _list_tasks_generations.get(user_id, 0)
+    result = await _single_flight(
+        ("list_tasks", user_id, completed, generation),
+        lambda: _call_tool(list_tasks(user_id=user_id, filters=filters), "Failed to list tasks")
+    )
+    if _list_tasks_generations.get(user_id, 0) == generation:
+        _store_list_tasks_result(cache_key, result)
+    return result
 
 
 @function_tool
-async def complete_task_tool(task_id: int, user_id: str, completed: bool) -> Dict[str, Any]:
+async def complete_task_tool(ctx: "RunContextWrapper[Dict[str, Any]]", task_id: int, completed: bool) -> Dict[str, Any]:
     """
     Mark a task as completed or not completed.
 
     Args:
         task_id: ID of the task to update
-        user_id: ID of the user who owns the task
         completed: Whether the task is completed or not
     """
-    params = {"task_id": task_id, "user_id": user_id, "completed": completed}
+    user_id = ctx.context["user_id"]
     try:
-        result = await complete_task(params)
-    except Exception as e:
-        print(f"DEBUG: Error in complete_task_tool: {e}")
-        import traceback
-        traceback.print_exc()
-        raise
-
-    # If the result is already a dictionary (direct core function call), return it
-    if isinstance(result, dict):
-        return result
-
-    # Parse the result from the CallToolResult content
-    if hasattr(result, 'content') and result.content:
-        text_content = result.content[0]  # Get first content item
-        content = json.loads(text_content.text)
-        if hasattr(result, 'isError') and result.isError:
-            raise Exception(content.get("error", "Failed to complete task"))
-        return content
-    else:
-        raise Exception("Failed to complete task - no content in result")
+        return await _call_tool(
+            complete_task(task_id=task_id, user_id=user_id, completed=completed),
+            "Failed to complete task"
+        )
+    finally:
+        _invalidate_list_tasks_cache(user_id)
 
 
 @function_tool
-async def update_task_tool(task_id: int, user_id: str, title: Optional[str] = None, description: Optional[str] = None) -> Dict[str, Any]:
+async def update_task_tool(ctx: "RunContextWrapper[Dict[str, Any]]", task_id: int, title: Optional[str] = None, description: Optional[str] = None) -> Dict[str, Any]:
     """
     Update an existing task.
 
     Args:
         task_id: ID of the task to update
-        user_id: ID of the user who owns the task
         title: New title for the task (optional)
         description: New description for the task (optional)
     """
-    params = {"task_id": task_id, "user_id": user_id}
-    if title is not None:
-        params["title"] = title
-    if description is not None:
-        params["description"] = description
-
+    user_id = ctx.context["user_id"]
     try:
-        result = await update_task(params)
-    except Exception as e:
-        print(f"DEBUG: Error in update_task_tool: {e}")
-        import traceback
-        traceback.print_exc()
-        raise
-
-    # If the result is already a dictionary (direct core function call), return it
-    if isinstance(result, dict):
-        return result
-
-    # Parse the result from the CallToolResult content
-    if hasattr(result, 'content') and result.content:
-        text_content = result.content[0]  # Get first content item
-        content = json.loads(text_content.text)
-        if hasattr(result, 'isError') and result.isError:
-            raise Exception(content.get("error", "Failed to update task"))
-        return content
-    else:
-        raise Exception("Failed to update task - no content in result")
+        return await _call_tool(
+            update_task(task_id=task_id, user_id=user_id, title=title, description=description),
+            "Failed to update task"
+        )
+    finally:
+        _invalidate_list_tasks_cache(user_id)
 
 
 @function_tool
-async def delete_task_tool(task_id: int, user_id: str) -> Dict[str, Any]:
+async def delete_task_tool(ctx: "RunContextWrapper[Dict[str, Any]]", task_id: int) -> Dict[str, Any]:
     """
     Delete a task.
 
     Args:
         task_id: ID of the task to delete
-        user_id: ID of the user who owns the task
     """
-    params = {"task_id": task_id, "user_id": user_id}
+    user_id = ctx.context["user_id"]
     try:
-        result = await delete_task(params)
-    except Exception as e:
-        print(f"DEBUG: Error in delete_task_tool: {e}")
-        import traceback
-        traceback.print_exc()
-        raise
+        return await _call_tool(
+            delete_task(task_id=task_id, user_id=user_id),
+            "Failed to delete task"
+        )
+    finally:
+        _invalidate_list_tasks_cache(user_id)
 
-    # If the result is already a dictionary (direct core function call), return it
-    if isinstance(result, dict):
-        return result
 
-    # Parse the result from the CallToolResult content
-    if hasattr(result, 'content') and result.content:
-        text_content = result.content[0]  # Get first content item
-        content = json.loads(text_content.text)
-        if hasattr(result, 'isError') and result.isError:
-            raise Exception(content.get("error", "Failed to delete task"))
-        return content
-    else:
-        raise Exception("Failed to delete task - no content in result")
+# Tools exposed to the agent, in the order they are offered to the model
+_TOOLS = (
+    add_task_tool,
+    list_tasks_tool,
+    complete_task_tool,
+    update_task_tool,
+    delete_task_tool
+)
 
 
-def create_todo_agent(user_id: str):
-    """Create a Todo management agent using the OpenAI Agent SDK tailored for a specific user."""
-    if not HAS_AGENTS:
-        return None
-        
-    # Ensure environment variables are loaded
-    if not os.environ.get("GEMINI_API_KEY"):
-        from dotenv import load_dotenv
-        load_dotenv()
-        print("Explicitly loaded dotenv in create_todo_agent")
-
-    model_name = os.environ.get("GEMINI_MODEL_NAME", "gemini-2.5-flash")
-    api_key = os.environ.get("GEMINI_API_KEY")
-    
+# Connection cap for the Gemini pool. Agent runs are admitted up to the same limit, so a
+# burst of chat messages queues here instead of timing out waiting for a pooled connection.
+GEMINI_MAX_CONNECTIONS = 100
+_agent_run_slots = asyncio.Semaphore(GEMINI_MAX_CONNECTIONS)
+
+_gemini_client: Optional[AsyncOpenAI] = None
+
+
+def get_gemini_client(api_key: Optional[str]) -> AsyncOpenAI:
+    """
+    Return the process-wide Gemini client, creating it on first use.
+
+    A single client keeps one pooled httpx connection set to the Gemini endpoint,
+    so requests reuse warm TCP/TLS connections instead of handshaking per agent.
+    """
+    global _gemini_client
+    if _gemini_client is None:
+        _gemini_client = AsyncOpenAI(
+            api_key=api_key or "missing_key_placeholder", # Prevent immediate crash to allow logging
+            base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
+            http_client=httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=GEMINI_MAX_CONNECTIONS, max_keepalive_connections=50, keepalive_expiry=300.0),
+                timeout=httpx.Timeout(30.0, connect=5.0)
+            )
+        )
+    return _gemini_client
+
+
+async def close_gemini_client() -> None:
+    """Close the shared Gemini client's connection pool on application shutdown."""
+    global _gemini_client
+    if _gemini_client is not None:
+        await _gemini_client.close()
+        _gemini_client = None
+        _get_chat_model.cache_clear()
+        get_todo_agent.cache_clear()
+
+
+@functools.lru_cache(maxsize=1)
+def _get_chat_model():
+    """Build the Gemini-backed chat model once; it is shared by every user's agent."""
+    model_name = _GEMINI_MODEL_NAME
+    api_key = _GEMINI_API_KEY
+
     if not api_key:
-        print("CRITICAL ERROR: GEMINI_API_KEY not found in environment!")
+        logger.critical("GEMINI_API_KEY not found in environment!")
     else:
-        # Debug print (partial key)
-        print(f"Using Gemini API Key: {api_key[:10]}... Model: {model_name}")
+        # Log only a prefix of the key
+        logger.info("Using Gemini API Key: %s... Model: %s", api_key[:10], model_name)
 
-    # Static client for direct OpenAI-like calls
-    gemini_client = AsyncOpenAI(
-        api_key=api_key or "missing_key_placeholder", # Prevent immediate crash to allow logging
-        base_url="https://generativelanguage.googleapis.com/v1beta/openai/"
+    return OpenAIChatCompletionsModel(
+        model=model_name,
+        openai_client=get_gemini_client(api_key)
     )
 
-    return Agent(
-        name="TodoManager",
-        instructions=f"""
+
+# Agent instructions are identical for every user; the user's ID travels in the run
+# context and is read by the tools, so the model never sees or supplies it. Keeping the
+# system prompt byte-identical across users and turns lets the provider reuse its
+# cached prefix, and cleandoc strips the source indentation that was billed as input
+# tokens on every call.
+_INSTRUCTIONS = inspect.cleandoc("""
         You are a helpful todo list manager that helps users manage their tasks.
-        The current user's ID is: {user_id}. 
-        IMPORTANT: You MUST always provide this user_id when calling any of the task management tools.
         
         Capabilities:
         - Add tasks: Use 'add_task_tool' with title and optional description.
@@ -242,21 +319,33 @@ def create_todo_agent(user_id: str):
         - Always ask for confirmation before deleting a task.
         - When listing tasks, provide a summary of what the user has to do.
         - Be friendly and encouraging.
-        """,
-        tools=[
-            add_task_tool,
-            list_tasks_tool,
-            complete_task_tool,
-            update_task_tool,
-            delete_task_tool
-        ],
-        model=OpenAIChatCompletionsModel(
-            model=model_name,
-            openai_client=gemini_client
-        )
+        """)
+
+
+@functools.lru_cache(maxsize=1)
+def get_todo_agent():
+    """Create the Todo management agent shared by every user, using the OpenAI Agent SDK."""
+    return Agent(
+        name="TodoManager",
+        instructions=_INSTRUCTIONS,
+        tools=list(_TOOLS),
+        model=_get_chat_model(),
+        # Let the model emit several tool calls per turn; the Runner executes a turn's
+        # function calls concurrently, so e.g. a list and an add overlap instead of
+        # costing two model round trips.
+        model_settings=ModelSettings(parallel_tool_calls=True)
     )
 
 
+def create_todo_agent(user_id: str):
+    """
+    Return the shared todo agent.
+
+    Kept for existing callers; the user ID is no longer part of the agent and is passed
+    to Runner.run as context instead (see run_agent_with_context).
+    """
+    return get_todo_agent()
+
 
 async def process_message(message: str, user_id: str) -> Dict[str, Any]:
     """
@@ -285,32 +374,69 @@ async def run_agent_with_context(messages: List[Dict[str, str]], user_id: str) -
         Dictionary with agent's response, tool calls, and success status
     """
     try:
-        if not HAS_AGENTS:
-            return {
-                "response": "I'm sorry, the AI agent service is currently unavailable (missing 'openai-agents' package). Please contact the administrator or install the package using 'pip install openai-agents'.",
-                "tool_calls": [],
-                "success": False
-            }
-            
-        agent = create_todo_agent(user_id)
-        result = await Runner.run(agent, messages)
-        
+        # Tools read the user ID from the run context rather than trusting a model-supplied argument
+        async with _agent_run_slots:
+            result = await Runner.run(get_todo_agent(), messages, context={"user_id": user_id})
+
+        # Most turns make no tool calls, so only build the list when there are some
+        tool_calls = []
+        raw_tool_calls = getattr(result, 'tool_calls', None)
+        if raw_tool_calls:
+            loads = orjson.loads
+            tool_calls = [
+                {"name": tc.function.name, "arguments": loads(tc.function.arguments)}
+                for tc in raw_tool_calls
+            ]
+
         return {
             "response": result.final_output if hasattr(result, 'final_output') else "I've processed your request.",
-            "tool_calls": [
-                {
-                    "name": tc.function.name,
-                    "arguments": json.loads(tc.function.arguments)
-                } for tc in result.tool_calls
-            ] if hasattr(result, 'tool_calls') and result.tool_calls else [],
+            "tool_calls": tool_calls,
             "success": True
         }
     except Exception as e:
-        import traceback
-        print(f"Agent execution error: {str(e)}\n{traceback.format_exc()}")
+        logger.exception("Agent execution error")
         return {
             "response": "I'm sorry, I encountered an error while processing your request.",
             "tool_calls": [],
             "success": False,
             "error": str(e)
-        }
\ No newline at end of file
+        }
+
+
+def _get_todo_agent_unavailable():
+    """Stand-in for get_todo_agent when 'openai-agents' is not installed."""
+    return None
+
+
+def _create_todo_agent_unavailable(user_id: str):
+    """Stand-in for create_todo_agent when 'openai-agents' is not installed."""
+    return None
+
+
+_AGENT_UNAVAILABLE_RESPONSE = "I'm sorry, the AI agent service is currently unavailable (missing 'openai-agents' package). Please contact the administrator or install the package using 'pip install openai-agents'."
+
+
+async def _run_agent_unavailable(messages: List[Dict[str, str]], user_id: str) -> Dict[str, Any]:
+    """Stand-in for run_agent_with_context when 'openai-agents' is not installed."""
+    return {
+        "response": _AGENT_UNAVAILABLE_RESPONSE,
+        "tool_calls": [],
+        "success": False
+    }
+
+
+async def _process_message_unavailable(message: str, user_id: str) -> Dict[str, Any]:
+    """Stand-in for process_message that skips building the message list when agents are unavailable."""
+    return {
+        "response": _AGENT_UNAVAILABLE_RESPONSE,
+        "tool_calls": [],
+        "success": False
+    }
+
+
+# Pick the implementations once at import rather than checking HAS_AGENTS on every call
+if not HAS_AGENTS:
+    get_todo_agent = _get_todo_agent_unavailable
+    create_todo_agent = _create_todo_agent_unavailable
+    run_agent_with_context = _run_agent_unavailable
+    process_message = _process_message_unavailable
@@ -4,32 +4,41 @@ This module handles user registration, authentication, password hashing,
 JWT token creation/verification, and token refresh functionality.
 """
 
+import asyncio
 import os
 import secrets
 import hashlib
+import heapq
 import hmac
 import re
+import threading
+import time
 import uuid
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
-from typing import Optional, Dict, Any
-from jose import JWTError, jwt
+from typing import Optional, Dict, Any, List, Set, Tuple, Union
+import jwt
+from fastapi import HTTPException, status
 from passlib.context import CryptContext
 from pydantic import BaseModel
 
+from ..config import settings
+
+
+# Accepted algorithms for verify_token, built once rather than as a new list per call
+_VERIFY_ALGORITHMS = (settings.JWT_ALGORITHM,)
+
 
 def verify_token(token: str) -> Dict[str, Any]:
     """Verify a JWT token and return its payload."""
-    from jose import jwt
-    from ..config import settings
     try:
         payload = jwt.decode(
             token,
             settings.JWT_SECRET_KEY,
-            algorithms=[settings.JWT_ALGORITHM]
+            algorithms=_VERIFY_ALGORITHMS
         )
         return payload
     except Exception as e:
-        from fastapi import HTTPException, status
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=f"Could not validate credentials: {str(e)}"
@@ -38,6 +47,9 @@ def verify_token(token: str) -> Dict[str, Any]:
 
 # Password hashing context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt is the only scheme, so call its handler directly and skip the context's
+# per-call scheme lookup
+_bcrypt = pwd_context.handler("bcrypt")
 
 # JWT settings
 SECRET_KEY = os.getenv("JWT_SECRET_KEY", secrets.token_urlsafe(32))
@@ -45,6 +57,31 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
 REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7"))
 
+# Username pattern compiled once at import
+_RE_USERNAME = re.compile(r'^[a-zA-Z0-9_-]+\Z')
+
+# Password character classes, one bit each, and a byte -> class lookup table so a
+# password is classified in a single C-level pass (bytes.translate)
+_PW_UPPER, _PW_LOWER, _PW_DIGIT, _PW_SPECIAL = 1, 2, 4, 8
+_PW_SPECIAL_CHARS = b'!@#$%^&*(),.?":{}|<>'
+_PASSWORD_CLASS_LUT = bytes(
+    _PW_UPPER if 0x41 <= b <= 0x5A else
+    _PW_LOWER if 0x61 <= b <= 0x7A else
+    _PW_DIGIT if 0x30 <= b <= 0x39 else
+    _PW_SPECIAL if b in _PW_SPECIAL_CHARS else
+    0
+    for b in range(256)
+)
+
+# Bounded cache of successfully verified tokens keyed by SHA-256 digest of the token
+VERIFIED_TOKEN_CACHE_MAX_SIZE = 10000
+VERIFIED_TOKEN_CACHE_TTL_SECONDS = 300
+
+# Short-lived cache of successful bcrypt verifications keyed by an HMAC of
+# (password, hash), so raw passwords are never held in memory
+PASSWORD_VERIFY_CACHE_MAX_SIZE = 4096
+PASSWORD_VERIFY_CACHE_TTL_SECONDS = 60
+
 
 class TokenData(BaseModel):
     """Token data model for JWT payload."""
@@ -77,7 +114,7 @@ class PasswordStrengthError(Exception):
 class RefreshToken:
     """Class to represent a refresh token with metadata."""
     def __init__(self, token_id: str, user_id: str, username: str,
-                 token_hash: str, expires_at: datetime, created_at: datetime,
+                 token_hash: bytes, expires_at: datetime, created_at: datetime,
                  is_revoked: bool = False):
         # Ensure datetime objects are timezone-aware
         if expires_at.tzinfo is None:
@@ -105,6 +142,16 @@ class AuthService:
         self.refresh_token_expire_days = REFRESH_TOKEN_EXPIRE_DAYS
         # In-memory storage for refresh tokens (in production, use a database)
         self.refresh_tokens_storage: Dict[str, RefreshToken] = {}
+        # Secondary indexes over refresh_tokens_storage so lookups avoid full scans
+        self._refresh_token_ids_by_hash: Dict[bytes, str] = {}
+        self._refresh_token_ids_by_user: Dict[str, Set[str]] = {}
+        self._refresh_token_expiry_heap: List[Tuple[datetime, str]] = []
+        # HMAC(secret, password + hash) -> monotonic time the successful verification expires
+        self._verified_passwords: "OrderedDict[bytes, float]" = OrderedDict()
+        # verify_password runs in asyncio.to_thread workers, so cache access is locked
+        self._verified_passwords_lock = threading.Lock()
+        # token digest -> (verified token data, wall-clock time the entry stops being valid)
+        self._verified_tokens: "OrderedDict[bytes, Tuple[Union[TokenData, RefreshTokenData], float]]" = OrderedDict()
 
     def hash_password(self, password: str) -> str:
         """
@@ -116,7 +163,7 @@ class AuthService:
         Returns:
             Hashed password string
         """
-        return pwd_context.hash(password)
+        return _bcrypt.hash(password)
 
     def verify_password(self, plain_password: str, hashed_password: str) -> bool:
         """
@@ -129,7 +176,29 @@ class AuthService:
         Returns:
             True if passwords match, False otherwise
         """
-        return pwd_context.verify(plain_password, hashed_password)
+        cache_key = hmac.new(
+            self.secret_key.encode(),
+            plain_password.encode() + b"\0" + hashed_password.encode(),
+            hashlib.sha256
+        ).digest()
+        now = time.monotonic()
+
+        with self._verified_passwords_lock:
+            valid_until = self._verified_passwords.get(cache_key)
+            if valid_until is not None:
+                if now < valid_until:
+                    return True
+                self._verified_passwords.pop(cache_key, None)
+
+        if not _bcrypt.verify(plain_password, hashed_password):
+            # Failed attempts are never cached, so each one still pays the full bcrypt cost
+            return False
+
+        with self._verified_passwords_lock:
+            self._verified_passwords[cache_key] = now + PASSWORD_VERIFY_CACHE_TTL_SECONDS
+            if len(self._verified_passwords) > PASSWORD_VERIFY_CACHE_MAX_SIZE:
+                self._verified_passwords.popitem(last=False)
+        return True
 
     def create_access_token(self, user_id: str, username: str) -> str:
         """
@@ -175,6 +244,45 @@ class AuthService:
         )
         return jwt.encode(token_data.dict(), self.secret_key, algorithm=self.algorithm)
 
+    def _get_verified_token(self, cache_key: bytes, token_type: str):
+        """
+        Return cached token data for a previously verified token of the given type.
+
+        Args:
+            cache_key: SHA-256 digest of the raw token
+            token_type: Expected token type ("access" or "refresh")
+
+        Returns:
+            Cached token data if present and unexpired, None otherwise
+        """
+        cached = self._verified_tokens.get(cache_key)
+        if cached is None:
+            return None
+
+        token_data, valid_until = cached
+        if time.time() >= valid_until:
+            del self._verified_tokens[cache_key]
+            return None
+
+        self._verified_tokens.move_to_end(cache_key)
+        return token_data if token_data.token_type == token_type else None
+
+    def _remember_verified_token(self, cache_key: bytes, token_data) -> None:
+        """
+        Cache successfully verified token data until the cache TTL or the token's expiry.
+
+        Args:
+            cache_key: SHA-256 digest of the raw token
+            token_data: Verified token data to cache
+        """
+        valid_until = time.time() + VERIFIED_TOKEN_CACHE_TTL_SECONDS
+        if token_data.exp:
+            valid_until = min(valid_until, token_data.exp)
+
+        self._verified_tokens[cache_key] = (token_data, valid_until)
+        if len(self._verified_tokens) > VERIFIED_TOKEN_CACHE_MAX_SIZE:
+            self._verified_tokens.popitem(last=False)
+
     def verify_access_token(self, token: str) -> Optional[TokenData]:
         """
         Verify and decode an access token.
@@ -185,21 +293,35 @@ class AuthService:
         Returns:
             TokenData object if valid, None if invalid
         """
+        cache_key = self._hash_token(token)
+        cached = self._get_verified_token(cache_key, "access")
+        if cached is not None:
+            return cached
+
         try:
             payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
-            token_data = TokenData(**payload)
 
-            # Check if token is an access token
-            if token_data.token_type != "access":
+            # Check claims on the decoded dict; the signed payload was produced by
+            # create_access_token, so it is not re-validated through Pydantic
+            if payload.get("token_type", "access") != "access":
                 return None
 
             # Check if token has expired
-            current_time = datetime.now(timezone.utc).timestamp()
-            if token_data.exp and current_time > token_data.exp:
+            exp = payload.get("exp")
+            if exp and time.time() > exp:
                 return None
 
+            token_data = TokenData.model_construct(
+                user_id=payload["user_id"],
+                username=payload["username"],
+                exp=exp,
+                iat=payload.get("iat"),
+                token_type="access"
+            )
+            self._remember_verified_token(cache_key, token_data)
             return token_data
-        except JWTError:
+        except (jwt.PyJWTError, KeyError):
+            # KeyError: signed payload without user_id/username claims
             return None
 
     def verify_refresh_token(self, token: str) -> Optional[RefreshTokenData]:
@@ -212,21 +334,35 @@ class AuthService:
         Returns:
             RefreshTokenData object if valid, None if invalid
         """
+        cache_key = self._hash_token(token)
+        cached = self._get_verified_token(cache_key, "refresh")
+        if cached is not None:
+            return cached
+
         try:
             payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
-            token_data = RefreshTokenData(**payload)
 
-            # Check if token is a refresh token
-            if token_data.token_type != "refresh":
+            # Check claims on the decoded dict; the signed payload was produced by
+            # create_refresh_token, so it is not re-validated through Pydantic
+            if payload.get("token_type", "refresh") != "refresh":
                 return None
 
             # Check if token has expired
-            current_time = datetime.now(timezone.utc).timestamp()
-            if token_data.exp and current_time > token_data.exp:
+            exp = payload.get("exp")
+            if exp and time.time() > exp:
                 return None
 
+            token_data = RefreshTokenData.model_construct(
+                user_id=payload["user_id"],
+                username=payload["username"],
+                exp=exp,
+                iat=payload.get("iat"),
+                token_type="refresh"
+            )
+            self._remember_verified_token(cache_key, token_data)
             return token_data
-        except JWTError:
+        except (jwt.PyJWTError, KeyError):
+            # KeyError: signed payload without user_id/username claims
             return None
 
     def create_tokens(self, user_id: str, username: str) -> Dict[str, str]:
@@ -272,17 +408,15 @@ class AuthService:
         # Hash the provided refresh token to compare with stored hash
         token_hash = self._hash_token(refresh_token)
 
-        # Find the matching stored token by user_id and token_hash
+        # Find the matching stored token by token_hash, then check user_id and validity
         stored_token = None
-        stored_token_id = None
-        for token_id, token_obj in self.refresh_tokens_storage.items():
-            if (token_obj.user_id == token_data.user_id and
-                token_obj.token_hash == token_hash and
-                not token_obj.is_revoked and
-                datetime.now(timezone.utc) <= token_obj.expires_at):
-                stored_token = token_obj
-                stored_token_id = token_id
-                break
+        stored_token_id = self._refresh_token_ids_by_hash.get(token_hash)
+        token_obj = self.refresh_tokens_storage.get(stored_token_id) if stored_token_id else None
+        if (token_obj is not None and
+            token_obj.user_id == token_data.user_id and
+            not token_obj.is_revoked and
+            datetime.now(timezone.utc) <= token_obj.expires_at):
+            stored_token = token_obj
 
         if not stored_token:
             # Token not found in storage, possibly already used or invalid
@@ -318,7 +452,7 @@ class AuthService:
             "token_type": "bearer"
         }
 
-    def _hash_token(self, token: str) -> str:
+    def _hash_token(self, token: str) -> bytes:
         """
         Create a hash of the token for secure storage.
 
@@ -326,9 +460,9 @@ class AuthService:
             token: The token string to hash
 
         Returns:
-            SHA-256 hash of the token
+            Raw 32-byte SHA-256 digest of the token
         """
-        return hashlib.sha256(token.encode()).hexdigest()
+        return hashlib.sha256(token.encode()).digest()
 
     def store_refresh_token(self, user_id: str, username: str, refresh_token: str) -> str:
         """
@@ -344,8 +478,8 @@ class AuthService:
         """
         token_id = str(uuid.uuid4())
         token_hash = self._hash_token(refresh_token)
-        expires_at = datetime.now(timezone.utc) + timedelta(days=self.refresh_token_expire_days)
         created_at = datetime.now(timezone.utc)
+        expires_at = created_at + timedelta(days=self.refresh_token_expire_days)
 
         refresh_token_obj = RefreshToken(
             token_id=token_id,
@@ -357,8 +491,31 @@ class AuthService:
         )
 
         self.refresh_tokens_storage[token_id] = refresh_token_obj
+        self._refresh_token_ids_by_hash[token_hash] = token_id
+        self._refresh_token_ids_by_user.setdefault(user_id, set()).add(token_id)
+        heapq.heappush(self._refresh_token_expiry_heap, (expires_at, token_id))
         return token_id
 
+    def _discard_refresh_token(self, token_id: str) -> None:
+        """
+        Remove a refresh token from storage and its secondary indexes.
+
+        Args:
+            token_id: The ID of the refresh token to remove
+        """
+        token_obj = self.refresh_tokens_storage.pop(token_id, None)
+        if token_obj is None:
+            return
+
+        if self._refresh_token_ids_by_hash.get(token_obj.token_hash) == token_id:
+            del self._refresh_token_ids_by_hash[token_obj.token_hash]
+
+        user_token_ids = self._refresh_token_ids_by_user.get(token_obj.user_id)
+        if user_token_ids is not None:
+            user_token_ids.discard(token_id)
+            if not user_token_ids:
+                del self._refresh_token_ids_by_user[token_obj.user_id]
+
     def get_refresh_token(self, token_id: str) -> Optional[RefreshToken]:
         """
         Retrieve a refresh token from storage by ID.
@@ -378,7 +535,7 @@ class AuthService:
         if (token_obj.is_revoked or
             datetime.now(timezone.utc) > token_obj.expires_at):
             # Remove expired/revoked token
-            del self.refresh_tokens_storage[token_id]
+            self._discard_refresh_token(token_id)
             return None
 
         return token_obj
@@ -409,8 +566,9 @@ class AuthService:
             Number of tokens revoked
         """
         revoked_count = 0
-        for token_id, token_obj in list(self.refresh_tokens_storage.items()):
-            if token_obj.user_id == user_id and not token_obj.is_revoked:
+        for token_id in self._refresh_token_ids_by_user.get(user_id, ()):
+            token_obj = self.refresh_tokens_storage[token_id]
+            if not token_obj.is_revoked:
                 token_obj.is_revoked = True
                 revoked_count += 1
         return revoked_count
@@ -425,9 +583,12 @@ class AuthService:
         removed_count = 0
         current_time = datetime.now(timezone.utc)
 
-        for token_id, token_obj in list(self.refresh_tokens_storage.items()):
-            if current_time > token_obj.expires_at:
-                del self.refresh_tokens_storage[token_id]
+        # The heap is ordered by expiry, so only expired entries are visited
+        expiry_heap = self._refresh_token_expiry_heap
+        while expiry_heap and current_time > expiry_heap[0][0]:
+            _, token_id = heapq.heappop(expiry_heap)
+            if token_id in self.refresh_tokens_storage:
+                self._discard_refresh_token(token_id)
                 removed_count += 1
 
         return removed_count
@@ -464,7 +625,7 @@ class AuthService:
             raise ValueError("Username must be between 3 and 50 characters")
 
         # Check for valid characters (alphanumeric and underscores/hyphens)
-        if not re.match(r'^[a-zA-Z0-9_-]+$', username):
+        if not _RE_USERNAME.match(username):
             raise ValueError("Username can only contain alphanumeric characters, underscores, and hyphens")
 
         return True
@@ -483,20 +644,27 @@ class AuthService:
         if len(password) < 8:
             raise PasswordStrengthError("Password must be at least 8 characters long")
 
+        # Classify every byte once; the set holds each character class present
+        char_classes = set(password.encode().translate(_PASSWORD_CLASS_LUT))
+        # The table only knows ASCII. Letters were always ASCII-only ([A-Z]/[a-z]), but
+        # digits were matched with \d, which also accepts other Unicode decimal digits
+        if _PW_DIGIT not in char_classes and not password.isascii() and any(map(str.isdecimal, password)):
+            char_classes.add(_PW_DIGIT)
+
         # Check for at least one uppercase letter
-        if not re.search(r'[A-Z]', password):
+        if _PW_UPPER not in char_classes:
             raise PasswordStrengthError("Password must contain at least one uppercase letter")
 
         # Check for at least one lowercase letter
-        if not re.search(r'[a-z]', password):
+        if _PW_LOWER not in char_classes:
             raise PasswordStrengthError("Password must contain at least one lowercase letter")
 
         # Check for at least one digit
-        if not re.search(r'\d', password):
+        if _PW_DIGIT not in char_classes:
             raise PasswordStrengthError("Password must contain at least one digit")
 
         # Check for at least one special character
-        if not re.search(r'[!@#$%^&*(),.?":{}|<>]', password):
+        if _PW_SPECIAL not in char_classes:
             raise PasswordStrengthError("Password must contain at least one special character")
 
         return True
@@ -531,6 +699,16 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return auth_service.verify_password(plain_password, hashed_password)
 
 
+async def hash_password_async(password: str) -> str:
+    """Hash a password in a worker thread so bcrypt does not block the event loop."""
+    return await asyncio.to_thread(auth_service.hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password in a worker thread so bcrypt does not block the event loop."""
+    return await asyncio.to_thread(auth_service.verify_password, plain_password, hashed_password)
+
+
 def create_access_token(user_id: str, username: str) -> str:
     """Create an access token using the global auth service."""
     return auth_service.create_access_token(user_id, username)
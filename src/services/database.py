@@ -1,33 +1,27 @@
 from sqlmodel import create_engine, Session, SQLModel
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
 from typing import AsyncGenerator
 from contextlib import asynccontextmanager
 import os
 from ..config import settings
 
 
-# Engines will be created lazily to avoid initialization issues during import
-def get_sync_engine():
-    """Get synchronous engine for sync operations."""
-    return create_engine(
-        settings.DATABASE_URL,
-        echo=settings.DATABASE_ECHO,
-    )
-
+def _async_database_url(url: str) -> str:
+    """
+    Normalize a database URL to the async psycopg driver, as database/connection.py does.
 
-def get_async_engine():
-    """Get asynchronous engine for async operations."""
-    return create_async_engine(
-        settings.DATABASE_URL,
-        echo=settings.DATABASE_ECHO,
-        pool_pre_ping=True,
-        pool_size=5,
-        max_overflow=10,
-    )
+    A plain postgresql:// URL would otherwise select the blocking psycopg2 dialect.
+    """
+    if url.startswith("postgresql+asyncpg://"):
+        return url.replace("postgresql+asyncpg://", "postgresql+psycopg://", 1)
+    if url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+psycopg://", 1)
+    return url
 
 
-# Global engine instances (initialized on first access)
+# Engines are created lazily on first access to avoid initialization issues during import
 _sync_engine = None
 _async_engine = None
 
@@ -36,9 +30,11 @@ def get_sync_engine():
     """Get synchronous engine for sync operations."""
     global _sync_engine
     if _sync_engine is None:
+        # Only used by scripts and one-off sync work, so don't hold idle connections open
         _sync_engine = create_engine(
             settings.DATABASE_URL,
             echo=settings.DATABASE_ECHO,
+            poolclass=NullPool,
         )
     return _sync_engine
 
@@ -47,12 +43,23 @@ def get_async_engine():
     """Get asynchronous engine for async operations."""
     global _async_engine
     if _async_engine is None:
+        async_url = _async_database_url(settings.DATABASE_URL)
+        connect_args = {}
+        if async_url.startswith("postgresql+psycopg") and os.environ.get("DB_PREPARE_THRESHOLD"):
+            # Same opt-in as database/connection.py (unsafe behind PgBouncer transaction pooling)
+            connect_args["prepare_threshold"] = int(os.environ["DB_PREPARE_THRESHOLD"])
         _async_engine = create_async_engine(
-            settings.DATABASE_URL,
+            async_url,
             echo=settings.DATABASE_ECHO,
             pool_pre_ping=True,
-            pool_size=5,
-            max_overflow=10,
+            # Same pool settings as database/connection.py
+            pool_size=int(os.environ.get("DB_POOL_SIZE", "20")),
+            max_overflow=int(os.environ.get("DB_MAX_OVERFLOW", "10")),
+            pool_recycle=int(os.environ.get("DB_POOL_RECYCLE", "300")),
+            # Reuse the most recently returned connection so idle ones can age out
+            pool_use_lifo=True,
+            query_cache_size=int(os.environ.get("DB_QUERY_CACHE_SIZE", "1000")),
+            connect_args=connect_args,
         )
     return _async_engine
 
@@ -1,4 +1,5 @@
 from sqlmodel import select, Session, and_
+from sqlalchemy import bindparam, delete, func, update
 from uuid import UUID
 from datetime import datetime
 from typing import List, Optional
@@ -6,6 +7,12 @@ from backend.src.models.task import Task, TaskCreate, TaskUpdate, TaskUpdateStat
 from backend.src.models.user import User
 
 
+# Ownership-scoped lookup of a single task, built once and reused with bound parameters
+_TASK_BY_ID_STMT = select(Task).where(
+    and_(Task.task_id == bindparam("task_id"), Task.user_id == bindparam("user_id"))
+)
+
+
 class TaskService:
     """Service class for handling task operations with user isolation"""
 
@@ -22,9 +29,9 @@ class TaskService:
         Returns:
             Created Task object
         """
-        # Create task with the specified user_id
+        # Create task with the specified user_id; table models do not re-validate on init
         task = Task(
-            **task_in.dict(),
+            **task_in.model_dump(),
             user_id=user_id
         )
         db_session.add(task)
@@ -46,10 +53,9 @@ class TaskService:
             Task object if found and belongs to user, None otherwise
         """
         # Ensure user can only access their own tasks
-        statement = select(Task).where(
-            and_(Task.task_id == task_id, Task.user_id == user_id)
-        )
-        task = db_session.exec(statement).first()
+        task = db_session.exec(
+            _TASK_BY_ID_STMT, params={"task_id": task_id, "user_id": user_id}
+        ).first()
         return task
 
     @staticmethod
@@ -84,30 +90,32 @@ class TaskService:
         Returns:
             Updated Task object if found and belongs to user, None otherwise
         """
-        # Get the existing task for the user
-        statement = select(Task).where(
-            and_(Task.task_id == task_id, Task.user_id == user_id)
+        now = datetime.utcnow()
+        values = task_in.model_dump(exclude_unset=True)
+
+        # If task is being marked as completed, keep an existing completed_at or stamp it now
+        if values.get('is_completed') is True:
+            values.setdefault('completed_at', func.coalesce(Task.completed_at, now))
+        # If task is being marked as not completed, clear completed_at timestamp
+        elif values.get('is_completed') is False:
+            values['completed_at'] = None
+
+        values['updated_at'] = now
+
+        # Apply the change and read the row back in a single UPDATE ... RETURNING round trip
+        result = db_session.execute(
+            update(Task)
+            .where(and_(Task.task_id == task_id, Task.user_id == user_id))
+            .values(**values)
+            .returning(Task)
         )
-        task = db_session.exec(statement).first()
+        task = result.scalars().one_or_none()
 
         if not task:
             return None
 
-        # Update the task with provided values
-        update_data = task_in.dict(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(task, field, value)
-
-        # If task is being marked as completed, set completed_at timestamp
-        if update_data.get('is_completed') is True and task.is_completed != True:
-            task.completed_at = datetime.utcnow()
-        # If task is being marked as not completed, clear completed_at timestamp
-        elif update_data.get('is_completed') is False:
-            task.completed_at = None
-
-        task.updated_at = datetime.utcnow()
-        db_session.add(task)
         db_session.commit()
+        # The caller's Session may expire on commit; reload now rather than lazily
         db_session.refresh(task)
         return task
 
@@ -125,27 +133,27 @@ class TaskService:
         Returns:
             Updated Task object if found and belongs to user, None otherwise
         """
-        # Get the existing task for the user
-        statement = select(Task).where(
-            and_(Task.task_id == task_id, Task.user_id == user_id)
+        now = datetime.utcnow()
+
+        # Update the completion status, setting completed_at when marked as completed,
+        # in a single UPDATE ... RETURNING round trip
+        result = db_session.execute(
+            update(Task)
+            .where(and_(Task.task_id == task_id, Task.user_id == user_id))
+            .values(
+                is_completed=status_in.is_completed,
+                completed_at=now if status_in.is_completed else None,
+                updated_at=now,
+            )
+            .returning(Task)
         )
-        task = db_session.exec(statement).first()
+        task = result.scalars().one_or_none()
 
         if not task:
             return None
 
-        # Update the completion status
-        task.is_completed = status_in.is_completed
-
-        # Set completed_at timestamp if being marked as completed
-        if status_in.is_completed:
-            task.completed_at = datetime.utcnow()
-        else:
-            task.completed_at = None
-
-        task.updated_at = datetime.utcnow()
-        db_session.add(task)
         db_session.commit()
+        # The caller's Session may expire on commit; reload now rather than lazily
         db_session.refresh(task)
         return task
 
@@ -162,18 +170,12 @@ class TaskService:
         Returns:
             True if task was deleted, False if not found or doesn't belong to user
         """
-        # Get the task for the user
-        statement = select(Task).where(
-            and_(Task.task_id == task_id, Task.user_id == user_id)
+        # Delete only if the task belongs to the user, in a single round trip
+        result = db_session.execute(
+            delete(Task).where(and_(Task.task_id == task_id, Task.user_id == user_id))
         )
-        task = db_session.exec(statement).first()
-
-        if not task:
-            return False
-
-        db_session.delete(task)
         db_session.commit()
-        return True
+        return result.rowcount > 0
 
     @staticmethod
     def get_user_completed_tasks(*, db_session: Session, user_id: UUID, skip: int = 0, limit: int = 100) -> List[Task]:
@@ -1,35 +1,89 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple, Union
+import bcrypt
 import jwt
-from passlib.context import CryptContext
-from fastapi import HTTPException, status, Depends
+from jwt.algorithms import get_default_algorithms
+from fastapi import HTTPException, Request, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlmodel import select
+from sqlalchemy import delete, exists
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import identity_key, make_transient_to_detached
+import asyncio
+import logging
 import uuid
 import hashlib
+import time
+
+try:
+    from argon2 import PasswordHasher
+    from argon2.exceptions import InvalidHashError, VerificationError
+    HAS_ARGON2 = True
+except ImportError:
+    HAS_ARGON2 = False
 
 from ..config import settings
-from ..models import User, TokenBlacklist
+from ..models import User, UserRead, TokenBlacklist
 from ..database import get_async_session
+from ..database.connection import AsyncSessionLocal
+
+
+logger = logging.getLogger(__name__)
 
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# New passwords are hashed with argon2id when the optional argon2-cffi package is installed,
+# otherwise with bcrypt (work factor BCRYPT_ROUNDS). Both formats always verify, and bcrypt
+# hashes are upgraded on the next successful login (see password_needs_rehash).
+_ARGON2_PREFIX = "$argon2"
+_argon2 = PasswordHasher(time_cost=2, memory_cost=64 * 1024, parallelism=2) if HAS_ARGON2 else None
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Verify a plain password against a hashed password.
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    if hashed_password.startswith(_ARGON2_PREFIX):
+        if _argon2 is None:
+            logger.error("Found an argon2 password hash but argon2-cffi is not installed")
+            return False
+        try:
+            return _argon2.verify(hashed_password, plain_password)
+        except (VerificationError, InvalidHashError):
+            return False
+    return bcrypt.checkpw(plain_password.encode(), hashed_password.encode())
 
 
 def hash_password(password: str) -> str:
     """
     Hash a plain password.
     """
-    return pwd_context.hash(password)
+    if _argon2 is not None:
+        return _argon2.hash(password)
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)).decode()
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """
+    Whether a stored hash should be replaced with a fresh hash_password result, i.e. it is
+    a bcrypt hash while argon2 is available, or an argon2 hash with outdated parameters.
+    """
+    if _argon2 is None:
+        return False
+    if not hashed_password.startswith(_ARGON2_PREFIX):
+        return True
+    return _argon2.check_needs_rehash(hashed_password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password in a worker thread so hashing does not block the event loop."""
+    return await asyncio.to_thread(verify_password, plain_password, hashed_password)
+
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password in a worker thread so hashing does not block the event loop."""
+    return await asyncio.to_thread(hash_password, password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
@@ -38,158 +92,509 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """
     to_encode = data.copy()
 
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=15)
-
-    to_encode.update({"exp": expire})
+    # PyJWT only needs integer timestamps, so skip building datetimes
+    now = int(time.time())
+    expires_in = int(expires_delta.total_seconds()) if expires_delta else 15 * 60
+    to_encode["iat"] = now
+    to_encode["exp"] = now + expires_in
 
-    encoded_jwt = jwt.encode(
+    encoded_jwt = _JWT.encode(
         to_encode,
-        settings.JWT_SECRET_KEY,
+        _JWT_KEY,
         algorithm=settings.JWT_ALGORITHM
     )
     return encoded_jwt
 
 
+def create_access_token_for_user(user_id: str, expires_in: int = 15 * 60) -> str:
+    """
+    Create a JWT access token carrying only the user_id claim, valid for expires_in seconds.
+
+    Login routes issue exactly this shape, so the payload is built directly.
+    """
+    now = int(time.time())
+    return _JWT.encode(
+        {"user_id": user_id, "iat": now, "exp": now + expires_in},
+        _JWT_KEY,
+        algorithm=settings.JWT_ALGORITHM
+    )
+
+
 # Security scheme for JWT
 security = HTTPBearer()
 
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+# JWT codec, algorithm list and signing key are resolved once at import instead of per call
+_JWT = jwt.PyJWT()
+_JWT_ALGORITHMS = [settings.JWT_ALGORITHM]
+_JWT_KEY = get_default_algorithms()[settings.JWT_ALGORITHM].prepare_key(
+    settings.JWT_SECRET_KEY
+)
+
+
+# Short-lived cache of verified JWT payloads keyed by hash_token(token), the same hash
+# the blacklist uses. Blacklist checks still run on every request, so only signature
+# verification is skipped; the TTL bounds how long a cached payload outlives revocation.
+TOKEN_CACHE_MAX_SIZE = 10000
+TOKEN_CACHE_TTL_SECONDS = 5
+# Claims every access token must carry; enforced inside the single verified decode
+_DECODE_OPTIONS = {"require": ["exp", "user_id"]}
+_token_cache: "OrderedDict[bytes, Tuple[Dict[str, Any], float]]" = OrderedDict()
+
+
+def decode_access_token(token: Union[str, bytes], token_hash: Optional[bytes] = None) -> Dict[str, Any]:
+    """
+    Decode and verify a JWT, reusing a recently verified payload when available.
+
+    Pass the token as bytes and token_hash when the caller already computed
+    hash_token(token), so the token is encoded and hashed only once.
+    """
+    cache_key = token_hash or hash_token(token)
+    now = time.monotonic()
+
+    cached = _token_cache.get(cache_key)
+    if cached is not None:
+        payload, cached_until = cached
+        if now < cached_until and time.time() < payload["exp"]:
+            _token_cache.move_to_end(cache_key)
+            return payload
+        del _token_cache[cache_key]
+
+    payload = _JWT.decode(
+        token,
+        _JWT_KEY,
+        algorithms=_JWT_ALGORITHMS,
+        options=_DECODE_OPTIONS
+    )
+
+    _token_cache[cache_key] = (payload, now + TOKEN_CACHE_TTL_SECONDS)
+    if len(_token_cache) > TOKEN_CACHE_MAX_SIZE:
+        _token_cache.popitem(last=False)
+
+    return payload
+
+
+def authenticate_scope(scope: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Verify the bearer token of an ASGI request and record the outcome in scope["state"].
+
+    The state gains "access_token" and "token_hash" plus either "token_payload" or
+    "token_error".
+    Requests without a bearer token are left untouched.
+    """
+    state = scope.setdefault("state", {})
+    for name, value in scope.get("headers", ()):
+        if name == b"authorization":
+            # Work on the raw header bytes so the token is never re-encoded for hashing
+            scheme, _, token = value.partition(b" ")
+            if scheme.lower() == b"bearer" and token:
+                state["access_token"] = token.decode("latin-1")
+                state["token_hash"] = token_hash = hash_token(token)
+                try:
+                    state["token_payload"] = decode_access_token(token, token_hash)
+                except jwt.ExpiredSignatureError:
+                    state["token_error"] = "Token has expired"
+                except jwt.PyJWTError:
+                    state["token_error"] = "Could not validate credentials"
+            break
+    return state
+
+
+async def get_current_user_id(
+    request: Request,
     session: AsyncSession = Depends(get_async_session)
-) -> User:
+) -> uuid.UUID:
     """
-    Get current authenticated user from JWT token.
+    Get the authenticated user's ID from the token verified by AuthMiddleware.
+
+    Unlike get_current_user this returns only the ID, so routes that only need it
+    are served from the user cache after the blacklist check when possible. Tokens
+    of deleted or deactivated users are rejected.
     """
+    state = request.scope.get("state") or {}
+    if "access_token" not in state:
+        # AuthMiddleware is not installed (or the header is missing); verify here
+        state = authenticate_scope(request.scope)
+
+    token = state.get("access_token")
+    if token is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    if "token_error" in state:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=state["token_error"]
+        )
+
+    # The user_id claim is guaranteed by the required-claims check in decode_access_token
     try:
-        # Decode the JWT token first to get the payload
-        payload = jwt.decode(
-            credentials.credentials,
-            settings.JWT_SECRET_KEY,
-            algorithms=[settings.JWT_ALGORITHM]
+        user_id = uuid.UUID(state["token_payload"]["user_id"])
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid user ID format"
+        )
+
+    # Check the blacklist and that the user still exists, from the user cache when possible
+    user = await _load_user_unless_revoked(session, user_id, state["token_hash"], legacy_hash_token(token))
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Account is deactivated"
+        )
+    return user_id
+
+
+# Recently loaded users keyed by user_id, so the requests that follow a login skip the user
+# lookup. Entries are UserRead snapshots, never ORM instances: an instance belongs to the
+# session that loaded it, so each request rebuilds its own User from the snapshot.
+USER_CACHE_MAX_SIZE = 50000
+USER_CACHE_TTL_SECONDS = 60
+_user_cache: "OrderedDict[uuid.UUID, Tuple[UserRead, float]]" = OrderedDict()
+
+
+def cache_user(user: User) -> None:
+    """Remember a freshly loaded user for USER_CACHE_TTL_SECONDS."""
+    snapshot = UserRead.model_validate(user, from_attributes=True)
+    _user_cache[user.user_id] = (snapshot, time.monotonic() + USER_CACHE_TTL_SECONDS)
+    _user_cache.move_to_end(user.user_id)
+    if len(_user_cache) > USER_CACHE_MAX_SIZE:
+        _user_cache.popitem(last=False)
+
+
+def invalidate_cached_user(user_id: uuid.UUID) -> None:
+    """Drop a user from the cache, e.g. after logout or a profile change."""
+    _user_cache.pop(user_id, None)
+
+
+def _get_cached_user(user_id: uuid.UUID) -> Optional[UserRead]:
+    cached = _user_cache.get(user_id)
+    if cached is None:
+        return None
+    snapshot, cached_until = cached
+    if time.monotonic() >= cached_until:
+        _user_cache.pop(user_id, None)
+        return None
+    return snapshot
+
+
+def _user_from_snapshot(session: AsyncSession, snapshot: UserRead) -> User:
+    """
+    Attach a User built from a cached snapshot to the session without a query. Columns
+    not in the snapshot (hashed_password) load from the database on first access.
+    """
+    existing = session.identity_map.get(identity_key(User, snapshot.user_id))
+    if existing is not None:
+        return existing
+    user = User(**snapshot.model_dump())
+    make_transient_to_detached(user)
+    session.add(user)
+    return user
+
+
+async def _load_user_unless_revoked(
+    session: AsyncSession,
+    user_id: uuid.UUID,
+    token_hash: bytes,
+    legacy_hash: Optional[bytes]
+) -> User:
+    """
+    Return the token's user, raising 401 if the token is blacklisted or the user no
+    longer exists. A recently loaded user is rebuilt from the user cache without a query.
+    """
+    hashes = _blacklist_hashes(token_hash, legacy_hash)
+    if _blacklisted_in_memory(hashes):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked"
         )
 
-        # Check if the token is blacklisted
-        if await is_token_blacklisted(credentials.credentials, session):
+    # Serve a recently loaded user after the indexed blacklist check alone
+    snapshot = _get_cached_user(user_id)
+    if snapshot is not None:
+        if await is_token_blacklisted(token_hash, session, legacy_hash):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Token has been revoked"
             )
+        return _user_from_snapshot(session, snapshot)
+
+    # Fetch user from database; an anti-join checks the blacklist in the same round
+    # trip (a revoked token then looks like a missing user)
+    statement = select(User).where(User.user_id == user_id).outerjoin(
+        TokenBlacklist,
+        (TokenBlacklist.token.in_(hashes)) & (TokenBlacklist.expires_at > datetime.utcnow())
+    ).where(TokenBlacklist.id.is_(None))
+    user = (await session.exec(statement)).first()
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials"
+        )
 
-        user_id_str: str = payload.get("user_id")
+    cache_user(user)
+    return user
 
-        if user_id_str is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Could not validate credentials"
-            )
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    session: AsyncSession = Depends(get_async_session)
+) -> User:
+    """
+    Get current authenticated user from JWT token.
+    """
+    try:
+        # Encode, hash and decode the JWT token once; exp and user_id are required claims
+        token = credentials.credentials.encode()
+        token_hash = hash_token(token)
+        payload = decode_access_token(token, token_hash)
 
         # Convert string to UUID
         try:
-            user_id = uuid.UUID(user_id_str)
+            user_id = uuid.UUID(payload["user_id"])
         except ValueError:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid user ID format"
             )
 
-        # Fetch user from database
-        user = await session.get(User, user_id)
-        if user is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Could not validate credentials"
-            )
-
-        return user
+        return await _load_user_unless_revoked(session, user_id, token_hash, legacy_hash_token(token))
 
     except jwt.ExpiredSignatureError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Token has expired"
         )
-    except jwt.JWTError:
+    except jwt.PyJWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials"
         )
 
 
-def hash_token(token: str) -> str:
+def hash_token(token: Union[str, bytes]) -> bytes:
     """
     Hash a JWT token for secure storage in the blacklist.
+
+    The fingerprint is an opaque lookup key, so a raw 16-byte BLAKE2b digest is used; it
+    is cheaper to compute than SHA-256 on every authenticated request and is stored and
+    bound as bytes without hex conversion. Hot paths pass the already-encoded token bytes.
+    """
+    if isinstance(token, str):
+        token = token.encode()
+    return hashlib.blake2b(token, digest_size=16).digest()
+
+
+# Blacklist rows written before the switch to BLAKE2b hold 32-byte SHA-256
+# fingerprints, which cannot be rehashed without the raw token. Until a blacklist refresh
+# has seen that none of them are left unexpired, tokens are checked against both forms.
+_LEGACY_HASH_LENGTH = 32
+_legacy_hashes_present = True
+
+
+def legacy_hash_token(token: Union[str, bytes]) -> Optional[bytes]:
+    """
+    Return the token's pre-BLAKE2b (SHA-256) blacklist fingerprint, or None once no
+    unexpired blacklist entry uses that format any more.
     """
-    return hashlib.sha256(token.encode()).hexdigest()
+    if not _legacy_hashes_present:
+        return None
+    if isinstance(token, str):
+        token = token.encode()
+    return hashlib.sha256(token).digest()
+
+
+def _blacklist_hashes(token_hash: bytes, legacy_hash: Optional[bytes]) -> Tuple[bytes, ...]:
+    return (token_hash,) if legacy_hash is None else (token_hash, legacy_hash)
+
+
+def _blacklisted_in_memory(hashes: Tuple[bytes, ...]) -> Optional[bool]:
+    """
+    Answer a blacklist check from the in-process blacklist, or return None when the
+    database has to be consulted.
+    """
+    # Only hits are authoritative: a token revoked by another worker is not in this
+    # process's set until the next refresh, so misses always fall through to the database
+    now = datetime.utcnow()
+    for h in hashes:
+        expires_at = _blacklisted_hashes.get(h)
+        if expires_at is not None and expires_at > now:
+            return True
+    return None
 
 
-async def is_token_blacklisted(token: str, session: AsyncSession) -> bool:
+async def is_token_blacklisted(
+    token_hash: bytes,
+    session: AsyncSession,
+    legacy_hash: Optional[bytes] = None
+) -> bool:
     """
     Check if a token is in the blacklist.
 
     Args:
-        token: The JWT token to check
+        token_hash: The token's hash as returned by hash_token
         session: Database session for querying
+        legacy_hash: The token's legacy fingerprint as returned by legacy_hash_token
 
     Returns:
         True if token is blacklisted, False otherwise
     """
+    hashes = _blacklist_hashes(token_hash, legacy_hash)
+    revoked = _blacklisted_in_memory(hashes)
+    if revoked is not None:
+        return revoked
+
     try:
-        # Hash the token for comparison
-        hashed_token = hash_token(token)
-
-        # Query for the blacklisted token
-        statement = select(TokenBlacklist).where(TokenBlacklist.token == hashed_token)
-        result = await session.exec(statement)
-        blacklisted_token = result.first()
-
-        if blacklisted_token:
-            # Check if the blacklisted token has expired
-            if blacklisted_token.expires_at < datetime.utcnow():
-                # Token has expired, remove it from blacklist (cleanup)
-                await session.delete(blacklisted_token)
-                await session.commit()
-                return False
-            return True
-        return False
-    except Exception:
-        # If there's an error checking the blacklist, treat it as not blacklisted
-        # to avoid blocking valid requests due to database issues
-        return False
+        # Expired entries simply don't match; run_blacklist_cleanup removes them later
+        statement = select(exists().where(
+            TokenBlacklist.token.in_(hashes),
+            TokenBlacklist.expires_at > datetime.utcnow()
+        ))
+        return bool(await session.scalar(statement))
+    except SQLAlchemyError:
+        # Failing open would accept revoked tokens, so report the outage instead
+        logger.exception("Token blacklist check failed")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Authentication is temporarily unavailable"
+        )
+
+
+# In-process blacklist: hash -> expires_at of every unexpired blacklist entry. It only
+# short-circuits hits; hashes missing here are always checked against the database.
+# Revocations made by this process are added immediately; ones made by other workers are
+# picked up on the next refresh, i.e. within TOKEN_BLACKLIST_REFRESH_INTERVAL_SECONDS.
+_blacklisted_hashes: Dict[bytes, datetime] = {}
+
+
+async def load_blacklisted_hashes() -> None:
+    """Reload the in-process blacklist from the database, keeping unexpired local additions."""
+    global _blacklisted_hashes, _legacy_hashes_present
+    now = datetime.utcnow()
+    async with AsyncSessionLocal() as session:
+        result = await session.exec(
+            select(TokenBlacklist.token, TokenBlacklist.expires_at)
+            .where(TokenBlacklist.expires_at > now)
+        )
+        fresh = dict(result.all())
+
+    # Entries added by blacklist_token while the query was in flight must survive the swap
+    for token_hash, expires_at in _blacklisted_hashes.items():
+        if expires_at > now:
+            fresh.setdefault(token_hash, expires_at)
+    _blacklisted_hashes = fresh
+    _legacy_hashes_present = any(len(h) == _LEGACY_HASH_LENGTH for h in fresh)
+
+
+async def _insert_blacklist_entry(session: AsyncSession, entry: TokenBlacklist) -> None:
+    """
+    Store one blacklist entry, treating a token that is already listed as success.
+
+    Entries are written inline, one per logout, rather than batched in the background:
+    logout must not report success before the revocation is durable and visible to
+    every process.
+    """
+    session.add(entry)
+    try:
+        await session.commit()
+    except IntegrityError:
+        # The unique index on token rejected a repeat logout with the same token
+        await session.rollback()
+
+
+BLACKLIST_CLEANUP_BATCH_SIZE = 1000
+BLACKLIST_CLEANUP_BATCH_PAUSE_SECONDS = 0.1
+
+
+async def purge_expired_blacklist_entries() -> int:
+    """
+    Delete expired blacklist entries in small batches, pausing between batches so the
+    cleanup never holds long locks. Returns the number of rows removed.
+    """
+    removed = 0
+    while True:
+        now = datetime.utcnow()
+        batch = (
+            select(TokenBlacklist.id)
+            .where(TokenBlacklist.expires_at <= now)
+            .limit(BLACKLIST_CLEANUP_BATCH_SIZE)
+        )
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                delete(TokenBlacklist).where(TokenBlacklist.id.in_(batch.scalar_subquery()))
+            )
+            await session.commit()
 
+        removed += result.rowcount
+        if result.rowcount < BLACKLIST_CLEANUP_BATCH_SIZE:
+            return removed
+        await asyncio.sleep(BLACKLIST_CLEANUP_BATCH_PAUSE_SECONDS)
 
-async def blacklist_token(token: str, session: AsyncSession, reason: str = "logout"):
+
+async def run_blacklist_cleanup() -> None:
+    """
+    Keep the in-process blacklist fresh and periodically purge expired entries,
+    until cancelled.
+    """
+    next_purge = 0.0
+    while True:
+        if time.monotonic() >= next_purge:
+            next_purge = time.monotonic() + settings.TOKEN_BLACKLIST_CLEANUP_INTERVAL_SECONDS
+            try:
+                removed = await purge_expired_blacklist_entries()
+                if removed:
+                    logger.info(f"Removed {removed} expired blacklisted tokens")
+            except Exception as e:
+                logger.warning(f"Token blacklist cleanup failed: {e}")
+        try:
+            await load_blacklisted_hashes()
+        except Exception as e:
+            logger.warning(f"Token blacklist refresh failed: {e}")
+        await asyncio.sleep(settings.TOKEN_BLACKLIST_REFRESH_INTERVAL_SECONDS)
+
+
+async def blacklist_token(
+    token: str,
+    session: AsyncSession,
+    reason: str = "logout",
+    payload: Optional[Dict[str, Any]] = None
+):
     """
     Add a token to the blacklist.
 
     Args:
         token: The JWT token to blacklist
-        session: Database session for storing
+        session: Database session for writing the blacklist entry
         reason: Reason for blacklisting (default: "logout")
+        payload: Already verified payload of the token, to skip decoding it again
     """
+    # Hash the token for secure storage
+    token_bytes = token.encode()
+    hashed_token = hash_token(token_bytes)
+
     try:
-        # Decode the token to get its expiration time
-        payload = jwt.decode(
-            token,
-            settings.JWT_SECRET_KEY,
-            algorithms=[settings.JWT_ALGORITHM]
-        )
+        # Decode the token to get its expiration time (served from the verified-token cache
+        # when the request was just authenticated)
+        if payload is None:
+            payload = decode_access_token(token_bytes, hashed_token)
 
-        # Get the expiration time from the token
-        exp_timestamp = payload.get("exp")
-        if exp_timestamp:
-            expires_at = datetime.utcfromtimestamp(exp_timestamp)
-        else:
-            # If no expiration in token, set a default (e.g., 1 hour from now)
-            expires_at = datetime.utcnow() + timedelta(hours=1)
+        # Get the expiration time from the token (a required claim)
+        expires_at = datetime.utcfromtimestamp(payload["exp"])
 
         # Generate a unique ID for the token (using the jti claim if available, otherwise hash)
-        jti = payload.get("jti", hash_token(token))
+        jti = payload.get("jti", hashed_token.hex())
 
-        # Hash the token for secure storage
-        hashed_token = hash_token(token)
+        # Revoke in this process right away
+        _blacklisted_hashes[hashed_token] = expires_at
+        _token_cache.pop(hashed_token, None)
+        try:
+            invalidate_cached_user(uuid.UUID(payload["user_id"]))
+        except (KeyError, ValueError):
+            pass
 
         # Create a new blacklisted token entry
         blacklisted_token = TokenBlacklist(
@@ -199,14 +604,11 @@ async def blacklist_token(token: str, session: AsyncSession, reason: str = "logo
             blacklisted_at=datetime.utcnow(),
             reason=reason
         )
-
-        # Add to database
-        session.add(blacklisted_token)
-        await session.commit()
+        await _insert_blacklist_entry(session, blacklisted_token)
     except jwt.ExpiredSignatureError:
         # Token is already expired, no need to blacklist
         pass
-    except jwt.JWTError:
+    except jwt.PyJWTError:
         # If token can't be decoded, we can't blacklist it properly
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -214,7 +616,7 @@ async def blacklist_token(token: str, session: AsyncSession, reason: str = "logo
         )
     except Exception as e:
         # Log the error but don't expose internal details to the user
-        print(f"Error blacklisting token: {str(e)}")  # In production, use proper logging
+        logger.error(f"Error blacklisting token: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to blacklist token"
@@ -0,0 +1,41 @@
+"""
+Queue-based logging so request handlers never block on stderr writes.
+
+The root logger's handlers are moved behind a QueueListener thread; the event loop
+only enqueues records through a QueueHandler.
+"""
+import logging
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+from typing import List, Optional
+
+_listener: Optional[QueueListener] = None
+_original_handlers: List[logging.Handler] = []
+
+
+def start_queue_logging() -> None:
+    """Route root log records through a background thread. Safe to call more than once."""
+    global _listener, _original_handlers
+    if _listener is not None:
+        return
+
+    root = logging.getLogger()
+    _original_handlers = root.handlers[:]
+    targets = _original_handlers or [logging.StreamHandler(sys.stderr)]
+
+    queue = SimpleQueue()
+    _listener = QueueListener(queue, *targets, respect_handler_level=True)
+    root.handlers = [QueueHandler(queue)]
+    _listener.start()
+
+
+def stop_queue_logging() -> None:
+    """Flush queued records and restore the root logger's original handlers."""
+    global _listener
+    if _listener is None:
+        return
+
+    _listener.stop()
+    logging.getLogger().handlers = _original_handlers
+    _listener = None
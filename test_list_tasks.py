@@ -36,7 +36,7 @@ async def test_list_tasks_core():
     print(f"Calling list_tasks_core with params: {params}")
     
     try:
-        result = await list_tasks_core(params)
+        result = await list_tasks_core(**params)
         print(f"list_tasks_core Success: {result['success']}")
         print(f"Tasks count: {len(result.get('tasks', []))}")
         if result.get('tasks'):
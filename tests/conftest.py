@@ -1,12 +1,14 @@
 import pytest
-from fastapi.testclient import TestClient
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
 from src.main import app
 
 
-@pytest.fixture
-def client():
-    """Create a test client for the FastAPI app."""
-    return TestClient(app)
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def async_client():
+    """Async client for the FastAPI app, opened once and shared by the whole test session."""
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        yield ac
 
 
 @pytest.fixture
@@ -1,14 +1,11 @@
 import pytest
-from fastapi.testclient import TestClient
 from unittest.mock import patch, AsyncMock
-from src.main import app
 
-client = TestClient(app)
+pytestmark = pytest.mark.asyncio(loop_scope="session")
 
 
-@pytest.mark.asyncio
 @patch('src.api.chat.agent_process_message')
-def test_chat_endpoint_success(mock_agent_process):
+async def test_chat_endpoint_success(mock_agent_process, async_client):
     """Test the chat endpoint with a successful response."""
     # Mock the agent response
     mock_agent_process.return_value = AsyncMock(return_value={
@@ -22,7 +19,7 @@ def test_chat_endpoint_success(mock_agent_process):
     }
 
     # Make the request
-    response = client.post(
+    response = await async_client.post(
         "/api/test_user_id/chat",
         json=test_data,
         headers={"Authorization": "Bearer fake_token"}
@@ -34,10 +31,10 @@ def test_chat_endpoint_success(mock_agent_process):
     assert response.status_code in [200, 401, 403]  # Depending on auth state
 
 
-def test_chat_endpoint_invalid_request():
+async def test_chat_endpoint_invalid_request(async_client):
     """Test the chat endpoint with invalid request data."""
     # Test with missing message
-    response = client.post(
+    response = await async_client.post(
         "/api/test_user_id/chat",
         json={},
         headers={"Authorization": "Bearer fake_token"}
@@ -47,13 +44,13 @@ def test_chat_endpoint_invalid_request():
     assert response.status_code in [400, 401, 403]
 
 
-def test_chat_endpoint_empty_message():
+async def test_chat_endpoint_empty_message(async_client):
     """Test the chat endpoint with an empty message."""
-    response = client.post(
+    response = await async_client.post(
         "/api/test_user_id/chat",
         json={"message": ""},
         headers={"Authorization": "Bearer fake_token"}
     )
 
     # Should return 401 (Unauthorized) or 400 (Bad Request) depending on auth
-    assert response.status_code in [400, 401, 403]
\ No newline at end of file
+    assert response.status_code in [400, 401, 403]
@@ -1,23 +1,21 @@
 import pytest
-from fastapi.testclient import TestClient
-from src.main import app
 
-client = TestClient(app)
+pytestmark = pytest.mark.asyncio(loop_scope="session")
 
 
-def test_health_check():
+async def test_health_check(async_client):
     """Test the health check endpoint."""
-    response = client.get("/health")
+    response = await async_client.get("/health")
     assert response.status_code == 200
     data = response.json()
     assert data["status"] == "ok"
     assert "Todo AI Chatbot API is running" in data["message"]
 
 
-def test_root_endpoint():
+async def test_root_endpoint(async_client):
     """Test the root endpoint."""
-    response = client.get("/")
+    response = await async_client.get("/")
     assert response.status_code == 200
     data = response.json()
     assert "message" in data
-    assert "Todo AI Chatbot API" in data["message"]
\ No newline at end of file
+    assert "Todo AI Chatbot API" in data["message"]